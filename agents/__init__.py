@@ -7,14 +7,35 @@ that can be used by nodes to perform specific tasks.
 No state management, no workflow knowledge, no orchestration logic.
 """
 
-from .log_analyzer import LogAnalyzer
-from .knowledge_searcher import KnowledgeSearcher
-from .ai_analyzer import AIAnalyzer
-from .email_notifier import EmailNotifier
+from __future__ import annotations
+
+from .log_analyzer import LogAnalyzer, AnomalyType, get_log_analyzer
+from .knowledge_searcher import KnowledgeSearcher, get_knowledge_searcher
+from .ai_analyzer import AIAnalyzer, get_ai_analyzer
+from .email_notifier import EMAIL_ENABLED, EmailNotifier, get_email_notifier, dispatch_email, wait_for_emails, drain_pending_emails
+from .text_features import TextFeatures, featurize, service_key, service_fingerprint
+from .types import LogResult, KnowledgeResult, ParsedIncident, RootCauseResult
 
 __all__ = [
     'LogAnalyzer',
+    'AnomalyType',
     'KnowledgeSearcher',
     'AIAnalyzer',
-    'EmailNotifier'
+    'EmailNotifier',
+    'get_log_analyzer',
+    'get_knowledge_searcher',
+    'get_ai_analyzer',
+    'get_email_notifier',
+    'EMAIL_ENABLED',
+    'dispatch_email',
+    'wait_for_emails',
+    'drain_pending_emails',
+    'LogResult',
+    'KnowledgeResult',
+    'ParsedIncident',
+    'RootCauseResult',
+    'TextFeatures',
+    'featurize',
+    'service_key',
+    'service_fingerprint'
 ]
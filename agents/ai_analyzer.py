@@ -4,26 +4,71 @@ Performs AI-powered analysis using Gemini
 NO state management, NO orchestration logic
 """
 
+from __future__ import annotations
+
+import asyncio
 import logging
-from typing import Dict, Any, Optional, List
-import google.generativeai as genai
+import re
+from typing import Dict, Any, Optional, List, Tuple, Iterable, Awaitable, Callable
 from config import get_config_value
+from utils.cache import LLMCache, shared_instance
+from .types import ParsedIncident, RootCauseResult
 
 logger = logging.getLogger("ai_analyzer")
 
+# Upper bound on incidents marshaled into a single Gemini request;
+# larger batches give diminishing returns and longer, less reliable responses
+MAX_BATCH_SIZE = 8
+
+# Contributing factor reported by the fallback root cause when Gemini is unavailable
+AI_UNAVAILABLE = 'AI analysis unavailable'
+
+_INCIDENT_SECTION_RE = re.compile(r'###\s*Incident\s*(\d+)', re.IGNORECASE)
+_CONFIDENCE_RE = re.compile(r'confidence[:\s]+(\d+\.?\d*)', re.IGNORECASE)
+_AI_FIELDS_RE = re.compile(
+    r'^[^\S\n]*(Service|Severity|Description)[^\S\n]*:[^\S\n]*(.*?)[^\S\n]*$',
+    re.MULTILINE
+)
+
+# Fields an alert parse needs before the rest of a streamed response can be skipped
+_ALERT_FIELDS = frozenset({'service', 'severity', 'description'})
+
+# Keywords used by the fallback parser, found in one pass (lookahead keeps overlapping hits)
+_SERVICE_KW_RE = re.compile(r'(?=(payment|auth|database|critical|high|low))', re.IGNORECASE)
+
 
 class AIAnalyzer:
     """Pure AI analysis tool - reusable across workflows"""
     
+    # Settings read from config once per process, shared by all instances
+    _config: Optional[Dict[str, Any]] = None
+    
     def __init__(self):
-        api_key = get_config_value("GEMINI_API_KEY", "")
-        model_name = get_config_value("GEMINI_MODEL", "gemini-2.0-flash")
+        config = self._load_config()
+        api_key = config['api_key']
+        model_name = config['model_name']
+        self.embedding_model = config['embedding_model']
+        
+        # Responses are cached by exact prompt, and alert parses also by embedding similarity
+        self.cache = LLMCache(
+            model_name,
+            maxsize=config['cache_size'],
+            embed_fn=self._embed,
+            similarity_threshold=config['cache_similarity']
+        )
+        
+        self._genai = None
         
         if not api_key:
             logger.warning("Gemini API key not configured")
             self.model = None
         else:
             try:
+                # Imported lazily: the SDK pulls in grpc/protobuf, which tools
+                # that never call Gemini should not pay for
+                import google.generativeai as genai
+                
+                self._genai = genai
                 genai.configure(api_key=api_key)
                 self.model = genai.GenerativeModel(model_name)
                 logger.info(f"Gemini client initialized with model: {model_name}")
@@ -31,7 +76,20 @@ class AIAnalyzer:
                 logger.error(f"Failed to initialize Gemini: {e}")
                 self.model = None
     
-    def parse_incident_alert(self, raw_alert: str) -> Dict[str, Any]:
+    @classmethod
+    def _load_config(cls) -> Dict[str, Any]:
+        """Read analyzer settings on first use"""
+        if cls._config is None:
+            cls._config = {
+                'api_key': get_config_value("GEMINI_API_KEY", ""),
+                'model_name': get_config_value("GEMINI_MODEL", "gemini-2.0-flash"),
+                'embedding_model': get_config_value("GEMINI_EMBEDDING_MODEL", "models/text-embedding-004"),
+                'cache_size': int(get_config_value("LLM_CACHE_SIZE", 256)),
+                'cache_similarity': float(get_config_value("LLM_CACHE_SIMILARITY", 0.92))
+            }
+        return cls._config
+    
+    def parse_incident_alert(self, raw_alert: str) -> ParsedIncident:
         """
         Parse unstructured incident alert into structured data
         
@@ -39,66 +97,256 @@ class AIAnalyzer:
             raw_alert: Raw alert text
             
         Returns:
-            Dictionary with parsed incident data (NO orchestration fields)
+            ParsedIncident record (NO orchestration fields)
+        """
+        return self.parse_incident_alerts([raw_alert])[0]
+    
+    def parse_incident_alerts(self, raw_alerts: List[str]) -> List[ParsedIncident]:
+        """
+        Parse several incident alerts, sharing one Gemini request per batch
+        
+        Args:
+            raw_alerts: Raw alert texts
+            
+        Returns:
+            List of ParsedIncident records, in input order
+        """
+        if not self.model:
+            return [self._default_parse(raw_alert) for raw_alert in raw_alerts]
+        
+        results = []
+        for start in range(0, len(raw_alerts), MAX_BATCH_SIZE):
+            results.extend(self._parse_alert_batch(raw_alerts[start:start + MAX_BATCH_SIZE]))
+        return results
+    
+    def analyze_root_cause(self, service: str, description: str, 
+                          log_results: Dict[str, Any], 
+                          knowledge_results: Dict[str, Any]) -> RootCauseResult:
+        """
+        Perform AI-powered root cause analysis
+        
+        Args:
+            service: Service name
+            description: Incident description
+            log_results: Results from log analysis
+            knowledge_results: Results from knowledge lookup
+            
+        Returns:
+            RootCauseResult record (NO orchestration fields)
+        """
+        return self.analyze_root_causes([(service, description, log_results, knowledge_results)])[0]
+    
+    def analyze_root_causes(self, cases: List[Tuple[str, str, Dict[str, Any], Dict[str, Any]]]) -> List[RootCauseResult]:
+        """
+        Perform root cause analysis for several incidents, sharing one Gemini request per batch
+        
+        Args:
+            cases: (service, description, log_results, knowledge_results) tuples
+            
+        Returns:
+            List of RootCauseResult records, in input order
+        """
+        if not self.model:
+            return [self._default_root_cause(case[0]) for case in cases]
+        
+        results = []
+        for start in range(0, len(cases), MAX_BATCH_SIZE):
+            results.extend(self._analyze_root_cause_batch(cases[start:start + MAX_BATCH_SIZE]))
+        return results
+    
+    async def aparse_incident_alert(self, raw_alert: str) -> ParsedIncident:
+        """
+        Async variant of parse_incident_alert for use inside an event loop
+        
+        Args:
+            raw_alert: Raw alert text
+            
+        Returns:
+            ParsedIncident record (NO orchestration fields)
         """
         if not self.model:
             return self._default_parse(raw_alert)
         
         try:
-            prompt = f"""Parse this incident alert and extract structured information.
-
-Alert: {raw_alert}
+            text = await self._agenerate(self._alert_prompt(raw_alert))
+            return self._build_parsed_incident(self._parse_ai_response(text), raw_alert)
+        except Exception as e:
+            logger.error(f"AI parsing error: {e}")
+            return self._default_parse(raw_alert)
+    
+    async def aanalyze_root_cause(self, service: str, description: str,
+                                  log_results: Dict[str, Any],
+                                  knowledge_results: Dict[str, Any]) -> RootCauseResult:
+        """
+        Async variant of analyze_root_cause for use inside an event loop
+        
+        Args:
+            service: Service name
+            description: Incident description
+            log_results: Results from log analysis
+            knowledge_results: Results from knowledge lookup
+            
+        Returns:
+            RootCauseResult record (NO orchestration fields)
+        """
+        if not self.model:
+            return self._default_root_cause(service)
+        
+        try:
+            prompt = self._root_cause_prompt(service, description, log_results, knowledge_results)
+            text = await self._agenerate(prompt)
+            return self._build_root_cause(self._parse_root_cause_response(text))
+        except Exception as e:
+            logger.error(f"AI root cause analysis error: {e}")
+            return self._default_root_cause(service)
+    
+    async def run_parallel(self, tasks: Iterable[Awaitable[Any]]) -> List[Any]:
+        """
+        Run independent analyses concurrently
+        
+        Args:
+            tasks: Awaitables such as aparse_incident_alert(...) calls
+            
+        Returns:
+            Results in the same order as tasks
+        """
+        return list(await asyncio.gather(*tasks))
+    
+    def _parse_alert_batch(self, raw_alerts: List[str]) -> List[ParsedIncident]:
+        """Parse one batch of alerts, falling back to per-alert requests for unparsed sections"""
+        if len(raw_alerts) == 1:
+            return [self._parse_single_alert(raw_alerts[0])]
+        
+        try:
+            sections = '\n'.join(
+                f"### Incident {i}\nAlert: {raw_alert}\n" for i, raw_alert in enumerate(raw_alerts, 1)
+            )
+            prompt = f"""Parse each of these incident alerts and extract structured information.
 
-Provide:
+{sections}
+For each incident provide:
 1. Service name (e.g., "Payment API", "Auth Service")
 2. Severity level (HIGH, MEDIUM, LOW)
 3. Brief description (1-2 sentences)
 
-Format your response as:
+Format your response with one block per incident, in the same order:
+### Incident <number>
 Service: <service_name>
 Severity: <severity_level>
 Description: <description>
 """
-            
-            response = self.model.generate_content(prompt)
-            text = response.text if hasattr(response, 'text') else str(response)
+            blocks = self._split_incident_blocks(self._generate(prompt))
+        except Exception as e:
+            logger.error(f"AI batch parsing error: {e}")
+            blocks = {}
+        
+        results = []
+        for i, raw_alert in enumerate(raw_alerts, 1):
+            parsed = self._parse_ai_response(blocks.get(i, ''))
+            if parsed.get('service'):
+                results.append(self._build_parsed_incident(parsed, raw_alert))
+            else:
+                results.append(self._parse_single_alert(raw_alert))
+        return results
+    
+    def _parse_single_alert(self, raw_alert: str) -> ParsedIncident:
+        """Parse a single alert with its own Gemini request"""
+        try:
+            text = self._generate(
+                self._alert_prompt(raw_alert),
+                semantic_text=raw_alert,
+                stop_when=_has_alert_fields
+            )
             
             # Parse response
             parsed = self._parse_ai_response(text)
             
-            return {
-                'service': parsed.get('service', 'Unknown Service'),
-                'severity': parsed.get('severity', 'MEDIUM'),
-                'description': parsed.get('description', raw_alert[:100])
-            }
+            return self._build_parsed_incident(parsed, raw_alert)
             
         except Exception as e:
             logger.error(f"AI parsing error: {e}")
             return self._default_parse(raw_alert)
     
-    def analyze_root_cause(self, service: str, description: str, 
-                          log_results: Dict[str, Any], 
-                          knowledge_results: Dict[str, Any]) -> Dict[str, Any]:
-        """
-        Perform AI-powered root cause analysis
+    def _analyze_root_cause_batch(self, cases: List[Tuple[str, str, Dict[str, Any], Dict[str, Any]]]) -> List[RootCauseResult]:
+        """Analyze one batch of incidents, falling back to per-incident requests for unparsed sections"""
+        if len(cases) == 1:
+            return [self._analyze_single_root_cause(*cases[0])]
         
-        Args:
-            service: Service name
-            description: Incident description
-            log_results: Results from log analysis
-            knowledge_results: Results from knowledge lookup
-            
-        Returns:
-            Dictionary with root cause analysis (NO orchestration fields)
-        """
-        if not self.model:
-            return self._default_root_cause(service)
+        try:
+            sections = '\n'.join(
+                f"### Incident {i}\nService: {service}\nDescription: {description}\n"
+                f"Context:\n{self._build_context(log_results, knowledge_results)}\n"
+                for i, (service, description, log_results, knowledge_results) in enumerate(cases, 1)
+            )
+            prompt = f"""Analyze each of these incidents and determine the root cause.
+
+{sections}
+For each incident provide:
+1. Root cause hypothesis
+2. Confidence level (0.0 to 1.0)
+3. Contributing factors
+4. Recommended solution
+5. Estimated resolution time
+
+Be specific and actionable. Start each answer with a "### Incident <number>" header,
+in the same order as above.
+"""
+            blocks = self._split_incident_blocks(self._generate(prompt))
+        except Exception as e:
+            logger.error(f"AI batch root cause analysis error: {e}")
+            blocks = {}
         
+        results = []
+        for i, case in enumerate(cases, 1):
+            block = blocks.get(i, '').strip()
+            if block:
+                results.append(self._build_root_cause(self._parse_root_cause_response(block)))
+            else:
+                results.append(self._analyze_single_root_cause(*case))
+        return results
+    
+    def _analyze_single_root_cause(self, service: str, description: str,
+                                   log_results: Dict[str, Any],
+                                   knowledge_results: Dict[str, Any]) -> RootCauseResult:
+        """Analyze a single incident with its own Gemini request"""
         try:
-            # Build context from other analyses
-            context = self._build_context(log_results, knowledge_results)
+            prompt = self._root_cause_prompt(service, description, log_results, knowledge_results)
+            text = self._generate(prompt)
+            
+            # Parse response
+            analysis = self._parse_root_cause_response(text)
+            
+            return self._build_root_cause(analysis)
             
-            prompt = f"""Analyze this incident and determine the root cause.
+        except Exception as e:
+            logger.error(f"AI root cause analysis error: {e}")
+            return self._default_root_cause(service)
+    
+    def _alert_prompt(self, raw_alert: str) -> str:
+        """Build the prompt for parsing a single alert"""
+        return f"""Parse this incident alert and extract structured information.
+
+Alert: {raw_alert}
+
+Provide:
+1. Service name (e.g., "Payment API", "Auth Service")
+2. Severity level (HIGH, MEDIUM, LOW)
+3. Brief description (1-2 sentences)
+
+Format your response as:
+Service: <service_name>
+Severity: <severity_level>
+Description: <description>
+"""
+    
+    def _root_cause_prompt(self, service: str, description: str,
+                           log_results: Dict[str, Any],
+                           knowledge_results: Dict[str, Any]) -> str:
+        """Build the prompt for analyzing a single incident"""
+        # Build context from other analyses
+        context = self._build_context(log_results, knowledge_results)
+        
+        return f"""Analyze this incident and determine the root cause.
 
 Service: {service}
 Description: {description}
@@ -115,58 +363,114 @@ Provide:
 
 Be specific and actionable.
 """
-            
+    
+    def _generate(self, prompt: str, semantic_text: Optional[str] = None,
+                  stop_when: Optional[Callable[[str], bool]] = None) -> str:
+        """
+        Send prompt to Gemini and return the response text, using the response cache
+        
+        Args:
+            prompt: Prompt text
+            semantic_text: Optional text for the semantic cache tier
+            stop_when: Optional predicate on the text received so far; when given,
+                the response is streamed and reading stops once it returns True
+        
+        Returns:
+            Response text (possibly truncated once stop_when was satisfied)
+        """
+        cached = self.cache.get(prompt, semantic_text)
+        if cached is not None:
+            return cached
+        
+        text = self._stream(prompt, stop_when) if stop_when else None
+        if text is None:
             response = self.model.generate_content(prompt)
             text = response.text if hasattr(response, 'text') else str(response)
-            
-            # Parse response
-            analysis = self._parse_root_cause_response(text)
-            
-            return {
-                'root_cause': analysis.get('root_cause', 'Unknown'),
-                'confidence': analysis.get('confidence', 0.7),
-                'contributing_factors': analysis.get('contributing_factors', []),
-                'recommended_solution': analysis.get('solution', 'Manual investigation required'),
-                'urgency': analysis.get('urgency', 'MEDIUM'),
-                'estimated_resolution_time': analysis.get('resolution_time', '30 minutes')
-            }
-            
+        self.cache.set(prompt, text, semantic_text)
+        return text
+    
+    def _stream(self, prompt: str, stop_when: Callable[[str], bool]) -> Optional[str]:
+        """Stream a response until stop_when is satisfied; None if streaming failed"""
+        text = ''
+        try:
+            for chunk in self.model.generate_content(prompt, stream=True):
+                text += chunk.text
+                if stop_when(text):
+                    # Remaining chunks are left unread
+                    break
         except Exception as e:
-            logger.error(f"AI root cause analysis error: {e}")
-            return self._default_root_cause(service)
+            logger.warning(f"Streaming failed, retrying with a full response: {e}")
+            return None
+        return text
+    
+    async def _agenerate(self, prompt: str) -> str:
+        """Send prompt to Gemini without blocking the event loop (exact-match cache only)"""
+        cached = self.cache.get(prompt)
+        if cached is not None:
+            return cached
+        
+        response = await self.model.generate_content_async(prompt)
+        text = response.text if hasattr(response, 'text') else str(response)
+        self.cache.set(prompt, text)
+        return text
+    
+    def _embed(self, text: str) -> List[float]:
+        """Embed text for the semantic response cache"""
+        result = self._genai.embed_content(model=self.embedding_model, content=text)
+        return result['embedding']
+    
+    def _split_incident_blocks(self, text: str) -> Dict[int, str]:
+        """Split a batched response into per-incident blocks keyed by incident number"""
+        parts = _INCIDENT_SECTION_RE.split(text)
+        # parts = [preamble, number, block, number, block, ...]
+        return {int(number): block for number, block in zip(parts[1::2], parts[2::2])}
+    
+    def _build_parsed_incident(self, parsed: Dict[str, Any], raw_alert: str) -> ParsedIncident:
+        """Fill in defaults for a parsed incident"""
+        return ParsedIncident(
+            service=parsed.get('service', 'Unknown Service'),
+            severity=parsed.get('severity', 'MEDIUM'),
+            description=parsed.get('description', raw_alert[:100]),
+            fallback=False
+        )
+    
+    def _build_root_cause(self, analysis: Dict[str, Any]) -> RootCauseResult:
+        """Map a parsed root cause analysis to the public result fields"""
+        return RootCauseResult(
+            root_cause=analysis.get('root_cause', 'Unknown'),
+            confidence=analysis.get('confidence', 0.7),
+            contributing_factors=analysis.get('contributing_factors', []),
+            recommended_solution=analysis.get('solution', 'Manual investigation required'),
+            urgency=analysis.get('urgency', 'MEDIUM'),
+            estimated_resolution_time=analysis.get('resolution_time', '30 minutes')
+        )
     
     def _build_context(self, log_results: Dict, knowledge_results: Dict) -> str:
         """Build context string from other analyses"""
         context_parts = []
         
         # Log analysis context
-        anomalies = log_results.get('anomalies', [])
+        anomalies = log_results.get('anomalies') or ()
         if anomalies:
             context_parts.append(f"Anomalies detected: {len(anomalies)}")
-            for anomaly in anomalies[:2]:
-                context_parts.append(f"  - {anomaly.get('type', 'unknown')}: {anomaly.get('pattern', '')}")
+            context_parts.extend(
+                f"  - {anomaly.get('type', 'unknown')}: {anomaly.get('pattern', '')}" for anomaly in anomalies[:2]
+            )
         
         # Knowledge base context
-        similar = knowledge_results.get('similar_incidents', [])
+        similar = knowledge_results.get('similar_incidents') or ()
         if similar:
             context_parts.append(f"\nSimilar past incidents: {len(similar)}")
-            for incident in similar[:2]:
-                context_parts.append(f"  - {incident.get('root_cause', 'unknown')}")
+            context_parts.extend(f"  - {incident.get('root_cause', 'unknown')}" for incident in similar[:2])
         
         return '\n'.join(context_parts) if context_parts else "No additional context available"
     
     def _parse_ai_response(self, text: str) -> Dict[str, Any]:
         """Parse AI response for incident parsing"""
-        parsed = {}
+        parsed = {match.group(1).lower(): match.group(2) for match in _AI_FIELDS_RE.finditer(text)}
         
-        for line in text.split('\n'):
-            line = line.strip()
-            if line.startswith('Service:'):
-                parsed['service'] = line.split(':', 1)[1].strip()
-            elif line.startswith('Severity:'):
-                parsed['severity'] = line.split(':', 1)[1].strip().upper()
-            elif line.startswith('Description:'):
-                parsed['description'] = line.split(':', 1)[1].strip()
+        if 'severity' in parsed:
+            parsed['severity'] = parsed['severity'].upper()
         
         return parsed
     
@@ -183,8 +487,7 @@ Be specific and actionable.
         }
         
         # Extract confidence if mentioned
-        import re
-        confidence_match = re.search(r'confidence[:\s]+(\d+\.?\d*)', text, re.IGNORECASE)
+        confidence_match = _CONFIDENCE_RE.search(text)
         if confidence_match:
             try:
                 conf = float(confidence_match.group(1))
@@ -201,37 +504,53 @@ Be specific and actionable.
         
         return analysis
     
-    def _default_parse(self, raw_alert: str) -> Dict[str, Any]:
+    def _default_parse(self, raw_alert: str) -> ParsedIncident:
         """Default parsing when AI is unavailable"""
         # Simple keyword extraction
         service = 'Unknown Service'
         severity = 'MEDIUM'
         
-        if 'payment' in raw_alert.lower():
+        keywords = {keyword.lower() for keyword in _SERVICE_KW_RE.findall(raw_alert)}
+        
+        if 'payment' in keywords:
             service = 'Payment API'
-        elif 'auth' in raw_alert.lower():
+        elif 'auth' in keywords:
             service = 'Auth Service'
-        elif 'database' in raw_alert.lower():
+        elif 'database' in keywords:
             service = 'Database'
         
-        if 'critical' in raw_alert.lower() or 'high' in raw_alert.lower():
+        if 'critical' in keywords or 'high' in keywords:
             severity = 'HIGH'
-        elif 'low' in raw_alert.lower():
+        elif 'low' in keywords:
             severity = 'LOW'
         
-        return {
-            'service': service,
-            'severity': severity,
-            'description': raw_alert[:200]
-        }
+        return ParsedIncident(
+            service=service,
+            severity=severity,
+            description=raw_alert[:200],
+            fallback=True
+        )
     
-    def _default_root_cause(self, service: str) -> Dict[str, Any]:
+    def _default_root_cause(self, service: str) -> RootCauseResult:
         """Default root cause when AI is unavailable"""
-        return {
-            'root_cause': f'Unknown root cause for {service}',
-            'confidence': 0.5,
-            'contributing_factors': ['AI analysis unavailable'],
-            'recommended_solution': 'Manual investigation required',
-            'urgency': 'MEDIUM',
-            'estimated_resolution_time': '30 minutes'
-        }
+        return RootCauseResult(
+            root_cause=f'Unknown root cause for {service}',
+            confidence=0.5,
+            contributing_factors=[AI_UNAVAILABLE],
+            recommended_solution='Manual investigation required',
+            urgency='MEDIUM',
+            estimated_resolution_time='30 minutes'
+        )
+
+
+def _has_alert_fields(text: str) -> bool:
+    """True once every alert field appears on a complete line of a streamed response"""
+    complete = text[:text.rfind('\n') + 1]
+    found = {match.group(1).lower() for match in _AI_FIELDS_RE.finditer(complete)}
+    return found >= _ALERT_FIELDS
+
+
+@shared_instance
+def get_ai_analyzer() -> AIAnalyzer:
+    """Shared AIAnalyzer instance (Gemini client and response cache built once)"""
+    return AIAnalyzer()
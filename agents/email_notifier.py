@@ -4,60 +4,39 @@ Sends email notifications
 NO state management, NO orchestration logic
 """
 
+from __future__ import annotations
+
+import asyncio
+import atexit
+import itertools
 import logging
+import queue
 import smtplib
+from concurrent.futures import Future, ThreadPoolExecutor
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from typing import Dict, Any, List
+from typing import Dict, Any, Callable, Iterable, List, Optional, Tuple
 from config import get_config_value
+from utils.cache import shared_instance
 
 logger = logging.getLogger("email_notifier")
 
+# Email can be switched off entirely (CI, local development) - nodes then skip it
+EMAIL_ENABLED: bool = bool(get_config_value("EMAIL_ENABLED", True))
 
-class EmailNotifier:
-    """Pure email notification tool - reusable across workflows"""
-    
-    def __init__(self):
-        self.email_from = get_config_value("EMAIL_FROM", "")
-        self.email_password = get_config_value("EMAIL_PASSWORD", "")
-        self.email_to = get_config_value("EMAIL_TO", "")
-        self.smtp_server = get_config_value("SMTP_SERVER", "smtp.gmail.com")
-        self.smtp_port = int(get_config_value("SMTP_PORT", 587))
-        
-        if not all([self.email_from, self.email_password, self.email_to]):
-            logger.warning("Email configuration incomplete - notifications disabled")
-    
-    def send_email(self, subject: str, content: str) -> bool:
-        """Send email notification"""
-        if not all([self.email_from, self.email_password, self.email_to]):
-            logger.warning("Email not configured - skipping notification")
-            return False
-        
-        try:
-            msg = MIMEMultipart()
-            msg['From'] = self.email_from
-            msg['To'] = self.email_to
-            msg['Subject'] = subject
-            
-            msg.attach(MIMEText(content, 'plain'))
-            
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.email_from, self.email_password)
-                server.send_message(msg)
-            
-            logger.info(f"Email sent: {subject}")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Failed to send email: {e}")
-            return False
-    
-    def send_incident_alert(self, incident_id: str, service: str, severity: str, description: str) -> bool:
-        """Send incident alert notification"""
-        subject = f"INCIDENT ALERT: {incident_id} - {service}"
-        
-        content = f"""
+# Background delivery - emails are notifications, not part of the workflow's result.
+# One worker per pooled SMTP session, so a burst of emails is sent in parallel.
+_email_executor = ThreadPoolExecutor(
+    max_workers=int(get_config_value("SMTP_POOL_SIZE", 5)),
+    thread_name_prefix="email"
+)
+# In-flight sends by email id (worker-thread futures and event-loop tasks)
+_pending_emails: Dict[str, Future] = {}
+_email_ids = itertools.count(1)
+
+# Notification templates - built once, only the variable fields are formatted per email
+_INCIDENT_ALERT_SUBJECT = "INCIDENT ALERT: {incident_id} - {service}"
+_INCIDENT_ALERT_TPL = """
 INCIDENT DETECTED
 =================
 
@@ -73,34 +52,24 @@ You will receive updates as the analysis progresses.
 
 This is an automated notification.
 """
-        
-        return self.send_email(subject, content)
-    
-    def send_analysis_update(self, incident_id: str, anomalies: List[str]) -> bool:
-        """Send log analysis update"""
-        subject = f"LOG ANALYSIS: {incident_id}"
-        
-        content = f"""
+
+_ANALYSIS_UPDATE_SUBJECT = "LOG ANALYSIS: {incident_id}"
+_ANALYSIS_UPDATE_TPL = """
 LOG ANALYSIS COMPLETE
 ====================
 
 Incident ID: {incident_id}
 
 Anomalies Detected:
-{chr(10).join(f'  - {anomaly}' for anomaly in anomalies[:5])}
+{anomalies}
 
 Root cause analysis is in progress.
 
 This is an automated notification.
 """
-        
-        return self.send_email(subject, content)
-    
-    def send_root_cause_update(self, incident_id: str, root_cause: str, confidence: float, solution: str) -> bool:
-        """Send root cause analysis update"""
-        subject = f"ROOT CAUSE ANALYSIS: {incident_id}"
-        
-        content = f"""
+
+_ROOT_CAUSE_UPDATE_SUBJECT = "ROOT CAUSE ANALYSIS: {incident_id}"
+_ROOT_CAUSE_UPDATE_TPL = """
 ROOT CAUSE ANALYSIS COMPLETE
 ============================
 
@@ -118,14 +87,9 @@ Decision making in progress.
 
 This is an automated notification.
 """
-        
-        return self.send_email(subject, content)
-    
-    def send_mitigation_report(self, incident_id: str, actions: List[str], status: str) -> bool:
-        """Send mitigation execution report"""
-        subject = f"MITIGATION COMPLETE: {incident_id}"
-        
-        content = f"""
+
+_MITIGATION_REPORT_SUBJECT = "MITIGATION COMPLETE: {incident_id}"
+_MITIGATION_REPORT_TPL = """
 AUTOMATED MITIGATION EXECUTED
 =============================
 
@@ -133,20 +97,15 @@ Incident ID: {incident_id}
 Status: {status}
 
 Actions Taken:
-{chr(10).join(f'  - {action}' for action in actions)}
+{actions}
 
 Incident has been automatically resolved.
 
 This is an automated notification.
 """
-        
-        return self.send_email(subject, content)
-    
-    def send_escalation_alert(self, incident_id: str, reason: str, context: Dict[str, Any]) -> bool:
-        """Send escalation alert"""
-        subject = f"ESCALATION REQUIRED: {incident_id}"
-        
-        content = f"""
+
+_ESCALATION_ALERT_SUBJECT = "ESCALATION REQUIRED: {incident_id}"
+_ESCALATION_ALERT_TPL = """
 HUMAN INTERVENTION REQUIRED
 ===========================
 
@@ -156,13 +115,320 @@ Escalation Reason:
 {reason}
 
 Context:
-  Service: {context.get('service', 'Unknown')}
-  Severity: {context.get('severity', 'Unknown')}
-  Confidence: {context.get('confidence', 0):.0%}
+  Service: {service}
+  Severity: {severity}
+  Confidence: {confidence:.0%}
 
 Please review and take appropriate action.
 
 This is an automated notification.
 """
+
+
+_DIGEST_SUBJECT = "INCIDENT SUMMARY: {incident_id} - {status}"
+_DIGEST_TPL = """
+INCIDENT RESPONSE SUMMARY
+=========================
+
+Incident ID: {incident_id}
+Status: {status}
+
+{sections}
+
+This is an automated notification.
+"""
+
+# Digest section per queued notification type
+_DIGEST_SECTIONS = {
+    'analysis_update': """LOG ANALYSIS
+------------
+Anomalies Detected:
+{anomalies}""",
+    'root_cause_update': """ROOT CAUSE ANALYSIS
+-------------------
+Root Cause:
+{root_cause}
+
+Confidence: {confidence:.0%}
+
+Recommended Solution:
+{solution}""",
+    'mitigation_report': """AUTOMATED MITIGATION
+--------------------
+Status: {status}
+
+Actions Taken:
+{actions}"""
+}
+
+# List fields rendered as bullets in a digest -> maximum items shown (None = all)
+_DIGEST_LISTS = {'anomalies': 5, 'actions': None}
+
+
+class _PooledSession:
+    """One pooled SMTP session and the number of messages sent over it"""
+    
+    __slots__ = ('conn', 'sent')
+    
+    def __init__(self):
+        self.conn = None
+        self.sent = 0
+
+
+class EmailNotifier:
+    """Pure email notification tool - reusable across workflows"""
+    
+    # Settings read from config once per process, shared by all instances
+    _config: Optional[Dict[str, Any]] = None
+    
+    def __init__(self):
+        config = self._load_config()
+        self.email_from = config['email_from']
+        self.email_password = config['email_password']
+        self.email_to = config['email_to']
+        self.smtp_server = config['smtp_server']
+        self.smtp_port = config['smtp_port']
+        self.pool_size = config['pool_size']
+        self.max_messages = config['max_messages']
+        
+        # Pool of authenticated SMTP sessions, opened on first use (smtplib is not
+        # thread-safe, so each session is checked out by one sender at a time).
+        # LIFO hands out the most recently used - still connected - session first.
+        self._pool: "queue.LifoQueue[_PooledSession]" = queue.LifoQueue()
+        for _ in range(self.pool_size):
+            self._pool.put(_PooledSession())
+        
+        if not all([self.email_from, self.email_password, self.email_to]):
+            logger.warning("Email configuration incomplete - notifications disabled")
+    
+    @classmethod
+    def _load_config(cls) -> Dict[str, Any]:
+        """Read SMTP settings on first use"""
+        if cls._config is None:
+            cls._config = {
+                'email_from': get_config_value("EMAIL_FROM", ""),
+                'email_password': get_config_value("EMAIL_PASSWORD", ""),
+                'email_to': get_config_value("EMAIL_TO", ""),
+                'smtp_server': get_config_value("SMTP_SERVER", "smtp.gmail.com"),
+                'smtp_port': int(get_config_value("SMTP_PORT", 587)),
+                'pool_size': max(1, int(get_config_value("SMTP_POOL_SIZE", 5))),
+                'max_messages': max(1, int(get_config_value("SMTP_MAX_MESSAGES", 100)))
+            }
+        return cls._config
+    
+    def send_email(self, subject: str, content: str) -> bool:
+        """Send email notification"""
+        if not all([self.email_from, self.email_password, self.email_to]):
+            logger.warning("Email not configured - skipping notification")
+            return False
         
+        try:
+            self._send_messages([self._build_message(subject, content)])
+            
+            logger.info(f"Email sent: {subject}")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Failed to send email: {e}")
+            return False
+    
+    def send_digest(self, incident_id: str, status: str, emails: List[Dict[str, Any]]) -> bool:
+        """
+        Send queued notifications as one digest email
+        
+        Args:
+            incident_id: Incident the notifications belong to
+            status: Final incident status, e.g. "RESOLVED"
+            emails: Entries from state["emails_pending"]
+            
+        Returns:
+            True if the digest was sent (or there was nothing to send)
+        """
+        if not emails:
+            return True
+        try:
+            subject, content = self._digest_email(incident_id, status, emails)
+        except Exception as e:
+            logger.error(f"Failed to build email digest: {e}")
+            return False
         return self.send_email(subject, content)
+    
+    def close_all(self) -> None:
+        """Close every pooled SMTP session (waits for sessions in use)"""
+        sessions = [self._pool.get() for _ in range(self.pool_size)]
+        for session in sessions:
+            self._quit(session)
+            self._pool.put(session)
+    
+    def _build_message(self, subject: str, content: str) -> MIMEMultipart:
+        """Build a plain-text email message"""
+        msg = MIMEMultipart()
+        msg['From'] = self.email_from
+        msg['To'] = self.email_to
+        msg['Subject'] = subject
+        
+        msg.attach(MIMEText(content, 'plain'))
+        return msg
+    
+    def _open(self, session: _PooledSession) -> smtplib.SMTP:
+        """Return the session's live SMTP connection, connecting and authenticating on first use"""
+        if session.conn is not None:
+            try:
+                if session.conn.noop()[0] == 250:
+                    return session.conn
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._quit(session)
+        
+        conn = smtplib.SMTP(self.smtp_server, self.smtp_port)
+        try:
+            conn.starttls()
+            conn.login(self.email_from, self.email_password)
+        except Exception:
+            conn.close()
+            raise
+        session.conn = conn
+        return conn
+    
+    def _send_messages(self, messages: List[MIMEMultipart]) -> None:
+        """Send messages in order over one pooled session"""
+        session = self._pool.get()
+        try:
+            for msg in messages:
+                try:
+                    self._open(session).send_message(msg)
+                except smtplib.SMTPServerDisconnected:
+                    # Server dropped the session between the liveness check and the send
+                    self._quit(session)
+                    self._open(session).send_message(msg)
+                self._count_sent(session)
+        finally:
+            self._pool.put(session)
+    
+    def _count_sent(self, session: _PooledSession) -> None:
+        """Count a sent message, recycling the connection at the provider's per-connection cap"""
+        session.sent += 1
+        if session.sent >= self.max_messages:
+            self._quit(session)
+    
+    def _quit(self, session: _PooledSession) -> None:
+        """Quit and forget the session's SMTP connection"""
+        if session.conn is not None:
+            try:
+                session.conn.quit()
+            except (smtplib.SMTPException, OSError):
+                session.conn.close()
+        session.conn = None
+        session.sent = 0
+    
+    def send_incident_alert(self, incident_id: str, service: str, severity: str, description: str) -> bool:
+        """Send incident alert notification"""
+        return self.send_email(*self._incident_alert_email(incident_id, service, severity, description))
+    
+    def send_analysis_update(self, incident_id: str, anomalies: List[str]) -> bool:
+        """Send log analysis update"""
+        return self.send_email(*self._analysis_update_email(incident_id, anomalies))
+    
+    def send_root_cause_update(self, incident_id: str, root_cause: str, confidence: float, solution: str) -> bool:
+        """Send root cause analysis update"""
+        return self.send_email(*self._root_cause_update_email(incident_id, root_cause, confidence, solution))
+    
+    def send_mitigation_report(self, incident_id: str, actions: List[str], status: str) -> bool:
+        """Send mitigation execution report"""
+        return self.send_email(*self._mitigation_report_email(incident_id, actions, status))
+    
+    def send_escalation_alert(self, incident_id: str, reason: str, context: Dict[str, Any]) -> bool:
+        """Send escalation alert"""
+        return self.send_email(*self._escalation_alert_email(incident_id, reason, context))
+    
+    def _incident_alert_email(self, incident_id: str, service: str, severity: str, description: str) -> Tuple[str, str]:
+        """Build incident alert notification"""
+        fields = {'incident_id': incident_id, 'service': service, 'severity': severity, 'description': description}
+        return _INCIDENT_ALERT_SUBJECT.format_map(fields), _INCIDENT_ALERT_TPL.format_map(fields)
+    
+    def _analysis_update_email(self, incident_id: str, anomalies: List[str]) -> Tuple[str, str]:
+        """Build log analysis update"""
+        fields = {'incident_id': incident_id, 'anomalies': _bullets(anomalies[:5])}
+        return _ANALYSIS_UPDATE_SUBJECT.format_map(fields), _ANALYSIS_UPDATE_TPL.format_map(fields)
+    
+    def _root_cause_update_email(self, incident_id: str, root_cause: str, confidence: float, solution: str) -> Tuple[str, str]:
+        """Build root cause analysis update"""
+        fields = {'incident_id': incident_id, 'root_cause': root_cause, 'confidence': confidence, 'solution': solution}
+        return _ROOT_CAUSE_UPDATE_SUBJECT.format_map(fields), _ROOT_CAUSE_UPDATE_TPL.format_map(fields)
+    
+    def _mitigation_report_email(self, incident_id: str, actions: List[str], status: str) -> Tuple[str, str]:
+        """Build mitigation execution report"""
+        fields = {'incident_id': incident_id, 'status': status, 'actions': _bullets(actions)}
+        return _MITIGATION_REPORT_SUBJECT.format_map(fields), _MITIGATION_REPORT_TPL.format_map(fields)
+    
+    def _digest_email(self, incident_id: str, status: str, emails: List[Dict[str, Any]]) -> Tuple[str, str]:
+        """Build digest of queued notifications, one section per notification"""
+        sections = []
+        for email in emails:
+            fields = dict(email)
+            for key, limit in _DIGEST_LISTS.items():
+                if key in fields:
+                    fields[key] = _bullets(fields[key][:limit])
+            sections.append(_DIGEST_SECTIONS[fields.pop('type')].format_map(fields))
+        fields = {'incident_id': incident_id, 'status': status, 'sections': '\n\n'.join(sections)}
+        return _DIGEST_SUBJECT.format_map(fields), _DIGEST_TPL.format_map(fields)
+    
+    def _escalation_alert_email(self, incident_id: str, reason: str, context: Dict[str, Any]) -> Tuple[str, str]:
+        """Build escalation alert"""
+        fields = {
+            'incident_id': incident_id,
+            'reason': reason,
+            'service': context.get('service', 'Unknown'),
+            'severity': context.get('severity', 'Unknown'),
+            'confidence': context.get('confidence', 0)
+        }
+        return _ESCALATION_ALERT_SUBJECT.format_map(fields), _ESCALATION_ALERT_TPL.format_map(fields)
+
+
+def _bullets(items: List[str]) -> str:
+    """Format items as an indented bullet list"""
+    return '\n'.join(f'  - {item}' for item in items)
+
+
+def dispatch_email(send: Callable[..., bool], *args: Any) -> str:
+    """
+    Deliver an email in the background without blocking the caller
+    
+    Args:
+        send: Sync send method such as notifier.send_incident_alert, run on
+            an email worker thread with args
+            
+    Returns:
+        Email id, for recording in state["emails_sent"] and wait_for_emails()
+    """
+    email_id = f"email-{next(_email_ids)}"
+    pending = _email_executor.submit(send, *args)
+    _pending_emails[email_id] = pending
+    pending.add_done_callback(lambda _: _pending_emails.pop(email_id, None))
+    return email_id
+
+
+async def wait_for_emails(email_ids: Iterable[str]) -> None:
+    """Wait for the given background emails, if still in flight, to finish"""
+    await _wait_for([_pending_emails.get(email_id) for email_id in email_ids])
+
+
+async def drain_pending_emails() -> None:
+    """Wait for every background email still in flight to finish"""
+    await _wait_for(list(_pending_emails.values()))
+
+
+async def _wait_for(pending: List[Optional[Future]]) -> None:
+    """Await sends running on the email worker threads, ignoring their errors"""
+    waiting = [asyncio.wrap_future(item) for item in pending if item is not None]
+    if waiting:
+        await asyncio.gather(*waiting, return_exceptions=True)
+
+
+@shared_instance
+def get_email_notifier() -> EmailNotifier:
+    """Shared EmailNotifier instance (SMTP sessions pooled across nodes)"""
+    notifier = EmailNotifier()
+    # QUIT the pooled sessions once at interpreter exit rather than after each email
+    atexit.register(notifier.close_all)
+    return notifier
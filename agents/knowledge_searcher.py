@@ -4,34 +4,127 @@ Searches historical incidents for similar patterns
 NO state management, NO orchestration logic
 """
 
+from __future__ import annotations
+
+import heapq
 import logging
-from typing import Dict, Any, List
+import sys
+from collections import defaultdict
+from types import MappingProxyType
+from typing import Dict, Any, List, FrozenSet, Mapping, Tuple, Union
+from utils.cache import shared_instance
+from .text_features import TextFeatures, as_features, tokenize
+from .types import KnowledgeResult
 
 logger = logging.getLogger("knowledge_searcher")
 
 
+# Historical incidents - read-only records shared by every searcher
+_PAST_INCIDENTS: Tuple[Mapping[str, Any], ...] = (
+    MappingProxyType({
+        'incident_id': 'INC-001',
+        'service': 'Payment API',
+        'anomaly': 'Database connection timeout',
+        'root_cause': 'Traffic spike exceeded connection pool limits',
+        'solution': 'Scale database connection pool from 50 to 100, restart service',
+        'keywords': ('database', 'timeout', 'connection', 'pool')
+    }),
+    MappingProxyType({
+        'incident_id': 'INC-002',
+        'service': 'Auth Service',
+        'anomaly': 'Memory leak',
+        'root_cause': 'Session objects not being garbage collected',
+        'solution': 'Deploy memory leak fix, restart service instances',
+        'keywords': ('memory', 'leak', 'session', 'garbage')
+    }),
+    MappingProxyType({
+        'incident_id': 'INC-003',
+        'service': 'Payment API',
+        'anomaly': 'High error rate',
+        'root_cause': 'Database query timeout due to missing index',
+        'solution': 'Add database index, optimize queries',
+        'keywords': ('error', 'database', 'query', 'timeout')
+    }),
+    MappingProxyType({
+        'incident_id': 'INC-004',
+        'service': 'Load Balancer',
+        'anomaly': 'Uneven traffic distribution',
+        'root_cause': 'Sticky session configuration issue',
+        'solution': 'Reconfigure load balancer session affinity',
+        'keywords': ('load', 'balancer', 'traffic', 'distribution')
+    }),
+    MappingProxyType({
+        'incident_id': 'INC-005',
+        'service': 'Auth Service',
+        'anomaly': 'Slow response time',
+        'root_cause': 'Cache invalidation storm',
+        'solution': 'Implement cache warming strategy',
+        'keywords': ('cache', 'slow', 'response', 'performance')
+    }),
+    MappingProxyType({
+        'incident_id': 'INC-006',
+        'service': 'Payment API',
+        'anomaly': 'Connection pool exhaustion',
+        'root_cause': 'Connection leak in payment processor',
+        'solution': 'Fix connection leak, increase pool size',
+        'keywords': ('connection', 'pool', 'exhaustion', 'leak')
+    }),
+    MappingProxyType({
+        'incident_id': 'INC-007',
+        'service': 'API Gateway',
+        'anomaly': 'Rate limit exceeded',
+        'root_cause': 'DDoS attack from single IP range',
+        'solution': 'Block malicious IPs, increase rate limits',
+        'keywords': ('rate', 'limit', 'ddos', 'attack')
+    }),
+    MappingProxyType({
+        'incident_id': 'INC-008',
+        'service': 'Database',
+        'anomaly': 'Replication lag',
+        'root_cause': 'Large batch update blocking replication',
+        'solution': 'Optimize batch updates, increase replication capacity',
+        'keywords': ('database', 'replication', 'lag', 'batch')
+    })
+)
+
+# Inverted index over the knowledge base, built once at import:
+# keyword -> indices of incidents carrying it
+_KW_SETS: Tuple[FrozenSet[str], ...] = tuple(
+    frozenset(sys.intern(k) for k in inc['keywords']) for inc in _PAST_INCIDENTS
+)
+_POSTINGS: Dict[str, FrozenSet[int]] = {
+    keyword: frozenset(idx for idx, keywords in enumerate(_KW_SETS) if keyword in keywords)
+    for keyword in frozenset().union(*_KW_SETS)
+}
+_ROW_NORMS: Tuple[int, ...] = tuple(len(keywords) for keywords in _KW_SETS)
+
+
 class KnowledgeSearcher:
     """Pure knowledge search tool - reusable across workflows"""
     
     def __init__(self):
-        self.past_incidents = self._load_knowledge_base()
+        self.past_incidents = _PAST_INCIDENTS
+        self._kw_sets = _KW_SETS
+        self._postings = _POSTINGS
+        self._row_norms = _ROW_NORMS
     
-    def search_similar_incidents(self, service: str, description: str, anomalies: List[Dict]) -> Dict[str, Any]:
+    def search_similar_incidents(self, service: str, description: Union[str, TextFeatures],
+                                 anomalies: List[Dict]) -> KnowledgeResult:
         """
         Search for similar historical incidents
         
         Args:
             service: Service name
-            description: Incident description
+            description: Incident description, or its precomputed TextFeatures
             anomalies: List of detected anomalies
             
         Returns:
-            Dictionary with similar incidents data (NO orchestration fields)
+            KnowledgeResult record (NO orchestration fields)
         """
         logger.info(f"Searching knowledge base for {service}")
         
         # Find similar incidents
-        similar = self._find_similar(service, description, anomalies)
+        similar = self._find_similar(service, as_features(description), anomalies)
         
         # Extract recommended solutions
         recommended_solutions = self._extract_solutions(similar)
@@ -39,119 +132,51 @@ class KnowledgeSearcher:
         # Calculate confidence
         confidence = self._calculate_confidence(similar)
         
-        return {
-            'similar_incidents': similar,
-            'total_matches': len(similar),
-            'confidence': confidence,
-            'recommended_solutions': recommended_solutions
-        }
-    
-    def _load_knowledge_base(self) -> List[Dict[str, Any]]:
-        """Load historical incidents from knowledge base"""
-        return [
-            {
-                'incident_id': 'INC-001',
-                'service': 'Payment API',
-                'anomaly': 'Database connection timeout',
-                'root_cause': 'Traffic spike exceeded connection pool limits',
-                'solution': 'Scale database connection pool from 50 to 100, restart service',
-                'keywords': ['database', 'timeout', 'connection', 'pool']
-            },
-            {
-                'incident_id': 'INC-002',
-                'service': 'Auth Service',
-                'anomaly': 'Memory leak',
-                'root_cause': 'Session objects not being garbage collected',
-                'solution': 'Deploy memory leak fix, restart service instances',
-                'keywords': ['memory', 'leak', 'session', 'garbage']
-            },
-            {
-                'incident_id': 'INC-003',
-                'service': 'Payment API',
-                'anomaly': 'High error rate',
-                'root_cause': 'Database query timeout due to missing index',
-                'solution': 'Add database index, optimize queries',
-                'keywords': ['error', 'database', 'query', 'timeout']
-            },
-            {
-                'incident_id': 'INC-004',
-                'service': 'Load Balancer',
-                'anomaly': 'Uneven traffic distribution',
-                'root_cause': 'Sticky session configuration issue',
-                'solution': 'Reconfigure load balancer session affinity',
-                'keywords': ['load', 'balancer', 'traffic', 'distribution']
-            },
-            {
-                'incident_id': 'INC-005',
-                'service': 'Auth Service',
-                'anomaly': 'Slow response time',
-                'root_cause': 'Cache invalidation storm',
-                'solution': 'Implement cache warming strategy',
-                'keywords': ['cache', 'slow', 'response', 'performance']
-            },
-            {
-                'incident_id': 'INC-006',
-                'service': 'Payment API',
-                'anomaly': 'Connection pool exhaustion',
-                'root_cause': 'Connection leak in payment processor',
-                'solution': 'Fix connection leak, increase pool size',
-                'keywords': ['connection', 'pool', 'exhaustion', 'leak']
-            },
-            {
-                'incident_id': 'INC-007',
-                'service': 'API Gateway',
-                'anomaly': 'Rate limit exceeded',
-                'root_cause': 'DDoS attack from single IP range',
-                'solution': 'Block malicious IPs, increase rate limits',
-                'keywords': ['rate', 'limit', 'ddos', 'attack']
-            },
-            {
-                'incident_id': 'INC-008',
-                'service': 'Database',
-                'anomaly': 'Replication lag',
-                'root_cause': 'Large batch update blocking replication',
-                'solution': 'Optimize batch updates, increase replication capacity',
-                'keywords': ['database', 'replication', 'lag', 'batch']
-            }
-        ]
+        return KnowledgeResult(
+            similar_incidents=similar,
+            total_matches=len(similar),
+            confidence=confidence,
+            recommended_solutions=recommended_solutions
+        )
     
-    def _find_similar(self, service: str, description: str, anomalies: List[Dict]) -> List[Dict[str, Any]]:
+    def _find_similar(self, service: str, features: TextFeatures, anomalies: List[Dict]) -> List[Dict[str, Any]]:
         """Find similar incidents using keyword matching"""
         similar = []
         
         # Extract keywords from current incident
-        current_keywords = set(description.lower().split())
-        current_keywords.add(service.lower())
+        current_keywords = features.tokens | {service.lower()}
         
         # Add anomaly types as keywords
         for anomaly in anomalies:
-            anomaly_type = anomaly.get('type', '').replace('_', ' ')
-            current_keywords.update(anomaly_type.split())
+            current_keywords |= tokenize(anomaly.get('type', '').replace('_', ' '))
         
-        # Match against historical incidents
-        for incident in self.past_incidents:
-            # Calculate similarity score
-            incident_keywords = set(incident['keywords'])
-            matched_keywords = current_keywords & incident_keywords
-            
-            if matched_keywords:
-                similarity_score = len(matched_keywords) / len(incident_keywords)
-                
-                # Include if similarity > 0.3
-                if similarity_score > 0.3:
-                    similar.append({
-                        'incident_id': incident['incident_id'],
-                        'service': incident['service'],
-                        'similarity_score': round(similarity_score, 2),
-                        'root_cause': incident['root_cause'],
-                        'solution': incident['solution'],
-                        'keywords_matched': list(matched_keywords)
-                    })
+        # Sparse equivalent of (incident x keyword) matrix @ query vector:
+        # walk the postings of each query keyword to count matches per incident
+        match_counts: Dict[int, int] = defaultdict(int)
+        for keyword in current_keywords:
+            for idx in self._postings.get(keyword, ()):
+                match_counts[idx] += 1
+        
+        # Score = matches / incident keyword count; include if similarity > 0.3
+        scored = []
+        for idx in sorted(match_counts):  # knowledge base order, so ties stay stable
+            similarity_score = match_counts[idx] / self._row_norms[idx]
+            if similarity_score > 0.3:
+                scored.append((round(similarity_score, 2), idx))
         
-        # Sort by similarity score
-        similar.sort(key=lambda x: x['similarity_score'], reverse=True)
+        # Top 5 by similarity score
+        for similarity_score, idx in heapq.nlargest(5, scored, key=lambda x: x[0]):
+            incident = self.past_incidents[idx]
+            similar.append({
+                'incident_id': incident['incident_id'],
+                'service': incident['service'],
+                'similarity_score': similarity_score,
+                'root_cause': incident['root_cause'],
+                'solution': incident['solution'],
+                'keywords_matched': list(current_keywords & self._kw_sets[idx])
+            })
         
-        return similar[:5]  # Return top 5
+        return similar
     
     def _extract_solutions(self, similar_incidents: List[Dict]) -> List[str]:
         """Extract recommended solutions from similar incidents"""
@@ -172,3 +197,9 @@ class KnowledgeSearcher:
         # Average of top 3 similarity scores
         top_scores = [inc['similarity_score'] for inc in similar_incidents[:3]]
         return round(sum(top_scores) / len(top_scores), 2)
+
+
+@shared_instance
+def get_knowledge_searcher() -> KnowledgeSearcher:
+    """Shared KnowledgeSearcher instance (knowledge base and index built once)"""
+    return KnowledgeSearcher()
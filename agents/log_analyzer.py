@@ -4,108 +4,137 @@ Analyzes system logs for anomalies
 NO state management, NO orchestration logic
 """
 
+from __future__ import annotations
+
 import logging
-from typing import Dict, Any, List
-from datetime import datetime
+from enum import IntEnum
+from typing import Dict, Any, List, FrozenSet, Tuple, Union
+from utils.cache import shared_instance
+from utils.time_utils import now_str
+from .text_features import TextFeatures, as_features
+from .types import LogResult
 
 logger = logging.getLogger("log_analyzer")
 
 
+class AnomalyType(IntEnum):
+    """Anomaly categories detected by LogAnalyzer"""
+    DB_TIMEOUT = 1
+    MEM_LEAK = 2
+    ERR_SPIKE = 3
+    NET = 4
+    
+    @property
+    def label(self) -> str:
+        """String label used in anomaly records, prompts and emails"""
+        return _ANOMALY_DETAILS[self]['type']
+
+
+# Trigger words for each anomaly type, in reporting order
+_ANOMALY_TRIGGERS: Tuple[Tuple[AnomalyType, FrozenSet[str]], ...] = (
+    (AnomalyType.DB_TIMEOUT, frozenset({'timeout', 'database'})),
+    (AnomalyType.MEM_LEAK, frozenset({'memory', 'leak'})),
+    (AnomalyType.ERR_SPIKE, frozenset({'error', 'failure'})),
+    (AnomalyType.NET, frozenset({'network', 'connection'}))
+)
+
+_ANOMALY_DETAILS: Dict[AnomalyType, Dict[str, Any]] = {
+    AnomalyType.DB_TIMEOUT: {
+        'type': 'database_timeout',
+        'severity': 'HIGH',
+        'pattern': 'Connection timeout after 30s',
+        'frequency': 15,
+        'time_range': '10:25-10:30'
+    },
+    AnomalyType.MEM_LEAK: {
+        'type': 'memory_leak',
+        'severity': 'HIGH',
+        'pattern': 'Memory usage increasing continuously',
+        'frequency': 8,
+        'time_range': '10:20-10:30'
+    },
+    AnomalyType.ERR_SPIKE: {
+        'type': 'error_spike',
+        'severity': 'MEDIUM',
+        'pattern': 'Error rate above threshold',
+        'frequency': 25,
+        'time_range': '10:25-10:30'
+    },
+    AnomalyType.NET: {
+        'type': 'network_issue',
+        'severity': 'MEDIUM',
+        'pattern': 'Connection failures detected',
+        'frequency': 12,
+        'time_range': '10:28-10:30'
+    }
+}
+
+_PATTERN_TEMPLATES: Dict[AnomalyType, Tuple[str, str]] = {
+    AnomalyType.DB_TIMEOUT: ("ERROR: {service} - Connection timeout after 30s",
+                             "WARN: {service} - Connection pool exhausted"),
+    AnomalyType.MEM_LEAK: ("WARN: {service} - Memory usage at 95%",
+                           "ERROR: {service} - OutOfMemoryError"),
+    AnomalyType.ERR_SPIKE: ("ERROR: {service} - Request failed with 500",
+                            "ERROR: {service} - Internal server error"),
+    AnomalyType.NET: ("ERROR: {service} - Connection refused",
+                      "WARN: {service} - Network timeout")
+}
+
+
 class LogAnalyzer:
     """Pure log analysis tool - reusable across workflows"""
     
-    def analyze_logs(self, service: str, description: str) -> Dict[str, Any]:
+    def analyze_logs(self, service: str, description: Union[str, TextFeatures]) -> LogResult:
         """
         Analyze logs for anomalies
         
         Args:
             service: Service name
-            description: Incident description
+            description: Incident description, or its precomputed TextFeatures
             
         Returns:
-            Dictionary with log analysis data (NO orchestration fields)
+            LogResult record (NO orchestration fields)
         """
         logger.info(f"Analyzing logs for {service}")
         
         # Simulate log analysis (in production, would query actual log systems)
-        anomalies = self._detect_anomalies(service, description)
+        anomaly_types = self._detect_anomalies(service, as_features(description))
+        anomalies = [dict(_ANOMALY_DETAILS[anomaly_type]) for anomaly_type in anomaly_types]
         
         # Generate log patterns
-        log_patterns = self._generate_log_patterns(service, anomalies)
+        log_patterns = self._generate_log_patterns(service, anomaly_types)
         
         # Calculate confidence
         analysis_confidence = 0.85 if anomalies else 0.3
         
-        return {
-            'service': service,
-            'anomalies': anomalies,
-            'anomalies_found': len(anomalies) > 0,
-            'log_patterns': log_patterns,
-            'analysis_confidence': analysis_confidence,
-            'analysis_timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        }
+        return LogResult(
+            service=service,
+            anomalies=anomalies,
+            anomalies_found=len(anomalies) > 0,
+            log_patterns=log_patterns,
+            analysis_confidence=analysis_confidence,
+            analysis_timestamp=now_str()
+        )
     
-    def _detect_anomalies(self, service: str, description: str) -> List[Dict[str, Any]]:
+    def _detect_anomalies(self, service: str, features: TextFeatures) -> List[AnomalyType]:
         """Detect anomalies based on service and description"""
-        anomalies = []
-        
         # Pattern matching for common issues
-        if 'timeout' in description.lower() or 'database' in description.lower():
-            anomalies.append({
-                'type': 'database_timeout',
-                'severity': 'HIGH',
-                'pattern': 'Connection timeout after 30s',
-                'frequency': 15,
-                'time_range': '10:25-10:30'
-            })
-        
-        if 'memory' in description.lower() or 'leak' in description.lower():
-            anomalies.append({
-                'type': 'memory_leak',
-                'severity': 'HIGH',
-                'pattern': 'Memory usage increasing continuously',
-                'frequency': 8,
-                'time_range': '10:20-10:30'
-            })
-        
-        if 'error' in description.lower() or 'failure' in description.lower():
-            anomalies.append({
-                'type': 'error_spike',
-                'severity': 'MEDIUM',
-                'pattern': 'Error rate above threshold',
-                'frequency': 25,
-                'time_range': '10:25-10:30'
-            })
-        
-        if 'network' in description.lower() or 'connection' in description.lower():
-            anomalies.append({
-                'type': 'network_issue',
-                'severity': 'MEDIUM',
-                'pattern': 'Connection failures detected',
-                'frequency': 12,
-                'time_range': '10:28-10:30'
-            })
-        
-        return anomalies
+        return [
+            anomaly_type for anomaly_type, words in _ANOMALY_TRIGGERS
+            if not words.isdisjoint(features.triggers)
+        ]
     
-    def _generate_log_patterns(self, service: str, anomalies: List[Dict]) -> List[str]:
+    def _generate_log_patterns(self, service: str, anomaly_types: List[AnomalyType]) -> List[str]:
         """Generate realistic log patterns"""
         patterns = []
         
-        for anomaly in anomalies:
-            anomaly_type = anomaly.get('type', '')
-            
-            if anomaly_type == 'database_timeout':
-                patterns.append(f"ERROR: {service} - Connection timeout after 30s")
-                patterns.append(f"WARN: {service} - Connection pool exhausted")
-            elif anomaly_type == 'memory_leak':
-                patterns.append(f"WARN: {service} - Memory usage at 95%")
-                patterns.append(f"ERROR: {service} - OutOfMemoryError")
-            elif anomaly_type == 'error_spike':
-                patterns.append(f"ERROR: {service} - Request failed with 500")
-                patterns.append(f"ERROR: {service} - Internal server error")
-            elif anomaly_type == 'network_issue':
-                patterns.append(f"ERROR: {service} - Connection refused")
-                patterns.append(f"WARN: {service} - Network timeout")
+        for anomaly_type in anomaly_types:
+            patterns.extend(template.format(service=service) for template in _PATTERN_TEMPLATES[anomaly_type])
         
         return patterns[:5]  # Limit to top 5
+
+
+@shared_instance
+def get_log_analyzer() -> LogAnalyzer:
+    """Shared LogAnalyzer instance"""
+    return LogAnalyzer()
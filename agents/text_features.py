@@ -0,0 +1,80 @@
+"""
+Text Features - Pure Tool
+Scans an incident description once for the features every analyzer needs
+NO state management, NO orchestration logic
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+import sys
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import FrozenSet, Union
+
+# Single pass over the description for every anomaly trigger word.
+# The lookahead reports overlapping hits, matching plain substring checks.
+_ANOMALY_RE = re.compile(r'(?=(timeout|database|memory|leak|error|failure|network|connection))')
+
+
+@dataclass(frozen=True)
+class TextFeatures:
+    """Features of one description, shared by LogAnalyzer and KnowledgeSearcher"""
+
+    __slots__ = ('tokens', 'triggers')
+
+    tokens: FrozenSet[str]
+    triggers: FrozenSet[str]
+
+
+@lru_cache(maxsize=1024)
+def tokenize(text: str) -> FrozenSet[str]:
+    """Lowercase and split text into interned keyword tokens (cached per string)"""
+    return frozenset(sys.intern(token) for token in text.lower().split())
+
+
+@lru_cache(maxsize=256)
+def featurize(description: str) -> TextFeatures:
+    """
+    Compute the shared features of a description (cached per string)
+
+    Args:
+        description: Incident description
+
+    Returns:
+        TextFeatures record
+    """
+    return TextFeatures(
+        tokens=tokenize(description),
+        triggers=frozenset(_ANOMALY_RE.findall(description.lower()))
+    )
+
+
+@lru_cache(maxsize=256)
+def service_key(service: str) -> str:
+    """Normalized service name, e.g. 'Payment API' -> 'payment_api' (cached per string)"""
+    return sys.intern("_".join(service.lower().split()))
+
+
+@lru_cache(maxsize=256)
+def service_fingerprint(service: str) -> str:
+    """
+    Stable short fingerprint of a service, for dedup and cache keys
+    
+    Unlike hash(), the value is the same across processes and runs.
+    
+    Args:
+        service: Service name
+        
+    Returns:
+        16-character hex digest of the normalized service name
+    """
+    return hashlib.blake2b(service_key(service).encode(), digest_size=8).hexdigest()
+
+
+def as_features(description: Union[str, TextFeatures]) -> TextFeatures:
+    """Accept either raw description text or precomputed features"""
+    if isinstance(description, TextFeatures):
+        return description
+    return featurize(description)
@@ -0,0 +1,75 @@
+"""
+Agent Result Types
+Slotted, immutable result records returned by the agent tools
+NO state management, NO orchestration logic
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, Any, List
+
+
+class _Result:
+    """Shared helpers for result records"""
+
+    __slots__ = ()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to a plain dictionary for workflow state"""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+@dataclass(frozen=True)
+class LogResult(_Result):
+    """Result of LogAnalyzer.analyze_logs"""
+
+    __slots__ = ('service', 'anomalies', 'anomalies_found', 'log_patterns',
+                 'analysis_confidence', 'analysis_timestamp')
+
+    service: str
+    anomalies: List[Dict[str, Any]]
+    anomalies_found: bool
+    log_patterns: List[str]
+    analysis_confidence: float
+    analysis_timestamp: str
+
+
+@dataclass(frozen=True)
+class KnowledgeResult(_Result):
+    """Result of KnowledgeSearcher.search_similar_incidents"""
+
+    __slots__ = ('similar_incidents', 'total_matches', 'confidence', 'recommended_solutions')
+
+    similar_incidents: List[Dict[str, Any]]
+    total_matches: int
+    confidence: float
+    recommended_solutions: List[str]
+
+
+@dataclass(frozen=True)
+class ParsedIncident(_Result):
+    """Result of AIAnalyzer.parse_incident_alert"""
+
+    __slots__ = ('service', 'severity', 'description', 'fallback')
+
+    service: str
+    severity: str
+    description: str
+    # True when keyword matching stood in for the AI parse
+    fallback: bool
+
+
+@dataclass(frozen=True)
+class RootCauseResult(_Result):
+    """Result of AIAnalyzer.analyze_root_cause"""
+
+    __slots__ = ('root_cause', 'confidence', 'contributing_factors', 'recommended_solution',
+                 'urgency', 'estimated_resolution_time')
+
+    root_cause: str
+    confidence: float
+    contributing_factors: List[str]
+    recommended_solution: str
+    urgency: str
+    estimated_resolution_time: str
@@ -3,6 +3,8 @@ Configuration Management
 Handles environment variables and .env file loading
 """
 
+from __future__ import annotations
+
 import os
 import logging
 from typing import Dict, Any
@@ -11,15 +13,27 @@ from typing import Dict, Any
 # Default configuration
 DEFAULT_CONFIG = {
     # Email Configuration
+    "EMAIL_ENABLED": True,
     "EMAIL_FROM": "",
     "EMAIL_PASSWORD": "",
     "EMAIL_TO": "",
     "SMTP_SERVER": "smtp.gmail.com",
     "SMTP_PORT": 587,
+    "SMTP_POOL_SIZE": 5,
+    "SMTP_MAX_MESSAGES": 100,
     
     # Gemini AI Configuration
     "GEMINI_API_KEY": "",
     "GEMINI_MODEL": "gemini-2.0-flash",
+    "GEMINI_EMBEDDING_MODEL": "models/text-embedding-004",
+    
+    # LLM Response Cache
+    "LLM_CACHE_SIZE": 256,
+    "LLM_CACHE_SIMILARITY": 0.92,
+    
+    # Root Cause Analysis Cache
+    "RCA_CACHE_SIZE": 1024,
+    "RCA_CACHE_TTL": 300,
     
     # System Thresholds
     "CONFIDENCE_THRESHOLD": 0.8,
@@ -58,16 +72,7 @@ class ConfigManager:
         for key in config:
             env_value = os.environ.get(key)
             if env_value is not None:
-                if isinstance(config[key], (int, float)):
-                    try:
-                        if isinstance(config[key], int):
-                            config[key] = int(env_value)
-                        else:
-                            config[key] = float(env_value)
-                    except ValueError:
-                        logger.warning(f"Invalid numeric value for {key}: {env_value}")
-                else:
-                    config[key] = env_value
+                self._set_value(config, key, env_value)
         
         # Load from .env file if exists
         self._load_env_file(config)
@@ -93,19 +98,27 @@ class ConfigManager:
                                     value = value[1:-1]
                                 
                                 if key in config:
-                                    if isinstance(config[key], (int, float)):
-                                        try:
-                                            if isinstance(config[key], int):
-                                                config[key] = int(value)
-                                            else:
-                                                config[key] = float(value)
-                                        except ValueError:
-                                            logger.warning(f"Invalid numeric value for {key}: {value}")
-                                    else:
-                                        config[key] = value
+                                    self._set_value(config, key, value)
             except Exception as e:
                 logger.warning(f"Error loading .env file: {e}")
     
+    @staticmethod
+    def _set_value(config: Dict[str, Any], key: str, value: str) -> None:
+        """Store a raw string setting, converted to the type of its default"""
+        current = config[key]
+        if isinstance(current, bool):
+            config[key] = value.strip().lower() in ("1", "true", "yes", "on")
+        elif isinstance(current, (int, float)):
+            try:
+                if isinstance(current, int):
+                    config[key] = int(value)
+                else:
+                    config[key] = float(value)
+            except ValueError:
+                logger.warning(f"Invalid numeric value for {key}: {value}")
+        else:
+            config[key] = value
+    
     def get(self, key: str, default: Any = None) -> Any:
         """Get configuration value"""
         return self._config.get(key, default)
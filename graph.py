@@ -4,13 +4,18 @@ Defines the incident response workflow structure and routing
 NO business logic - that's in nodes/
 """
 
+from __future__ import annotations
+
+import asyncio
 import logging
-from typing import Dict, Any, List
-from datetime import datetime
+from functools import lru_cache
+from typing import Dict, Any, List, Tuple, Union
 import uuid
 from langgraph.graph import StateGraph, END
+from langgraph.types import Send
 
 from state import IncidentState
+from utils.time_utils import now_str
 from nodes import (
     incident_trigger_node,
     log_analysis_node,
@@ -25,8 +30,11 @@ from nodes import (
 
 logger = logging.getLogger("graph")
 
+# Analysis nodes dispatched in parallel after the incident trigger
+ANALYSIS_NODES = ("log_analysis", "knowledge_lookup", "root_cause")
+
 
-def create_incident_workflow():
+def create_incident_workflow(checkpointer=None):
     """
     Create the incident response workflow graph
     
@@ -37,6 +45,10 @@ def create_incident_workflow():
     - Routing logic
     
     NO business logic here!
+    
+    Args:
+        checkpointer: Optional LangGraph checkpointer (e.g. MemorySaver) that
+            persists state after every step
     """
     logger.info("Building LangGraph incident response workflow...")
     
@@ -64,10 +76,8 @@ def create_incident_workflow():
         route_after_trigger
     )
     
-    # All analysis nodes route to coordinator
-    workflow.add_edge("log_analysis", "coordinator")
-    workflow.add_edge("knowledge_lookup", "coordinator")
-    workflow.add_edge("root_cause", "coordinator")
+    # Coordinator waits for all analysis nodes (join barrier)
+    workflow.add_edge(list(ANALYSIS_NODES), "coordinator")
     
     # Coordinator routes to decision
     workflow.add_conditional_edges(
@@ -91,12 +101,22 @@ def create_incident_workflow():
     logger.info("LangGraph workflow created successfully")
     logger.info("Flow: Trigger → [3 Parallel Analyses] → Coordinator → Decision → Action → Communicator")
     
-    return workflow.compile()
+    return workflow.compile(checkpointer=checkpointer)
+
+
+@lru_cache(maxsize=1)
+def get_workflow():
+    """
+    Shared compiled workflow
+    
+    The graph structure never changes, so it is built and compiled once per process
+    """
+    return create_incident_workflow()
 
 
 # Routing Functions (Orchestration Logic)
 
-def route_after_trigger(state: IncidentState) -> List[str]:
+def route_after_trigger(state: IncidentState) -> Union[List[str], List[Send]]:
     """
     Route after incident trigger
     
@@ -104,7 +124,7 @@ def route_after_trigger(state: IncidentState) -> List[str]:
     """
     # Check for errors
     if state.get("error"):
-        logger.error(f"Incident trigger failed: {state['error']}")
+        logger.error("Incident trigger failed: %s", state['error'])
         return [END]
     
     # Check if we have service info
@@ -113,44 +133,20 @@ def route_after_trigger(state: IncidentState) -> List[str]:
         logger.warning("Could not identify service - ending workflow")
         return [END]
     
-    # Launch all 3 analysis nodes in parallel
+    # Launch all 3 analysis nodes in parallel (async nodes, so they overlap on I/O).
+    # Send schedules each as its own task with the current state as input.
     logger.info("Launching 3 analysis nodes in parallel...")
-    return ["log_analysis", "knowledge_lookup", "root_cause"]
+    return [Send(node, state) for node in ANALYSIS_NODES]
 
 
 def route_after_coordination(state: IncidentState) -> str:
     """
     Route after coordination
     
-    Orchestration logic - checks if all analyses completed
+    Orchestration logic - the join barrier guarantees all analyses have run,
+    so coordination always proceeds to decision (completion is logged by the coordinator)
     """
-    # Check which analyses have completed
-    expected_analyses = {"log_analysis", "knowledge_lookup", "root_cause"}
-    
-    # Check if we have results from all analyses
-    has_log = bool(state.get("log_analysis_results"))
-    has_knowledge = bool(state.get("knowledge_lookup_results"))
-    has_root_cause = bool(state.get("root_cause_results"))
-    
-    completed = []
-    if has_log:
-        completed.append("log_analysis")
-    if has_knowledge:
-        completed.append("knowledge_lookup")
-    if has_root_cause:
-        completed.append("root_cause")
-    
-    logger.info(f"Analyses completed: {', '.join(completed)}")
-    
-    # Check if all expected analyses completed
-    if set(completed) >= expected_analyses:
-        logger.info("All analyses complete - proceeding to decision")
-        return "decision"
-    else:
-        missing = expected_analyses - set(completed)
-        logger.warning(f"Still waiting for: {', '.join(missing)}")
-        # Proceed to decision with available results
-        return "decision"
+    return "decision"
 
 
 def route_after_decision(state: IncidentState) -> str:
@@ -171,98 +167,142 @@ def route_after_decision(state: IncidentState) -> str:
 
 # Workflow Execution
 
-def execute_incident_workflow(raw_alert: str) -> Dict[str, Any]:
+def execute_incident_workflow(raw_alert: str, display: bool = True) -> Dict[str, Any]:
     """
     Execute the incident response workflow
     
     This is the main entry point for processing an incident
+    
+    Args:
+        raw_alert: Raw alert text
+        display: Log the results summary; callers that reuse the summary rows
+            pass False and call display_results() themselves
     """
     logger.info("=" * 70)
     logger.info("STARTING INCIDENT RESPONSE WORKFLOW")
-    logger.info(f"Alert: {raw_alert[:100]}...")
+    logger.info("Alert: %s...", raw_alert[:100])
     logger.info("=" * 70)
     
-    # Create workflow
-    workflow = create_incident_workflow()
+    # Reuse the compiled workflow
+    workflow = get_workflow()
     
     # Create initial state
     initial_state = create_initial_state(raw_alert)
     
-    # Execute workflow
+    # Execute workflow - async so the analysis nodes run concurrently
     logger.info("Executing workflow...")
-    final_state = workflow.invoke(initial_state)
+    final_state = asyncio.run(workflow.ainvoke(initial_state))
     
     # Display results
-    display_results(final_state)
+    if display:
+        display_results(final_state)
     
     return final_state
 
 
+async def execute_incident_workflow_batch(raw_alerts: List[str], display: bool = True) -> List[Dict[str, Any]]:
+    """
+    Execute the incident response workflow for several alerts concurrently
+    
+    Args:
+        raw_alerts: Raw alert texts
+        display: Log each results summary (see execute_incident_workflow)
+        
+    Returns:
+        Final states in the same order as raw_alerts
+    """
+    logger.info("=" * 70)
+    logger.info("STARTING %d INCIDENT RESPONSE WORKFLOWS", len(raw_alerts))
+    logger.info("=" * 70)
+    
+    workflow = get_workflow()
+    initial_states = [create_initial_state(raw_alert) for raw_alert in raw_alerts]
+    
+    # All incidents share one event loop, so total time tracks the slowest incident
+    logger.info("Executing workflows...")
+    final_states = await asyncio.gather(*(workflow.ainvoke(state) for state in initial_states))
+    
+    if display:
+        for final_state in final_states:
+            display_results(final_state)
+    
+    return list(final_states)
+
+
 def create_initial_state(raw_alert: str) -> IncidentState:
     """
     Create initial state for workflow
     
     This is orchestration-level state initialization
     """
-    incident_id = f"INC-{datetime.now().strftime('%Y%m%d')}-{str(uuid.uuid4())[:8].upper()}"
+    created_at = now_str()
+    incident_id = f"INC-{created_at[:10].replace('-', '')}-{str(uuid.uuid4())[:8].upper()}"
     
+    # Result slots, emails and decision fields are left unset (IncidentState is
+    # total=False): nodes read them with .get() defaults
     return IncidentState(
         incident_id=incident_id,
         raw_alert=raw_alert,
-        timestamp=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-        
-        service="",
-        severity="",
-        description="",
-        
-        log_analysis_results={},
-        knowledge_lookup_results={},
-        root_cause_results={},
-        mitigation_results={},
-        escalation_results={},
-        
-        coordination_summary={},
-        
-        decision="",
-        decision_metrics={},
-        escalation_reason="",
-        
-        agents_completed=[],
-        agent_errors=[],
-        
-        emails_sent=[],
-        
+        timestamp=created_at,
         retry_count=0,
-        error="",
         workflow_complete=False,
-        updated_at=datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        updated_at=created_at
     )
 
 
-def display_results(state: IncidentState) -> None:
-    """Display workflow results"""
-    logger.info("=" * 70)
-    logger.info("WORKFLOW COMPLETED")
-    logger.info(f"Incident ID: {state['incident_id']}")
-    logger.info("=" * 70)
+def build_summary_rows(state: Dict[str, Any]) -> List[Tuple[str, str]]:
+    """
+    Format the workflow summary once for every output channel
     
-    # Display decision
-    decision = state.get("decision", "unknown")
-    logger.info(f"Decision: {decision.upper()}")
+    Args:
+        state: Final workflow state
+        
+    Returns:
+        (label, value) rows in display order
+    """
+    rows = [
+        ("Incident ID", state.get("incident_id", "Unknown")),
+        ("Service", state.get("service", "Unknown")),
+        ("Severity", state.get("severity", "Unknown")),
+        ("Decision", state.get("decision", "unknown").upper())
+    ]
     
-    # Display metrics
     metrics = state.get("decision_metrics", {})
     if metrics:
-        logger.info(f"Confidence: {metrics.get('confidence', 0):.2f}")
-        logger.info(f"Anomalies Found: {metrics.get('anomalies_found', False)}")
-        logger.info(f"Similar Incidents: {metrics.get('similar_incidents_count', 0)}")
+        rows.append(("Confidence", f"{metrics.get('confidence', 0):.2f}"))
+        rows.append(("Anomalies Found", str(metrics.get("anomalies_found", False))))
+        rows.append(("Similar Incidents", str(metrics.get("similar_incidents_count", 0))))
         
         if metrics.get("escalation_reason"):
-            logger.warning(f"Escalation Reason: {metrics['escalation_reason']}")
+            rows.append(("Escalation Reason", metrics["escalation_reason"]))
     
-    # Display final status
     final_report = state.get("final_report", {})
     if final_report:
-        logger.info(f"Final Status: {final_report.get('status', 'Unknown')}")
+        rows.append(("Final Status", final_report.get("status", "Unknown")))
+    
+    return rows
+
+
+def display_results(state: IncidentState) -> List[Tuple[str, str]]:
+    """
+    Display workflow results
+    
+    Args:
+        state: Final workflow state
+        
+    Returns:
+        The summary rows, so other outputs can reuse them instead of rebuilding
+    """
+    rows = build_summary_rows(state)
+    if not logger.isEnabledFor(logging.INFO):
+        return rows
+    
+    logger.info("=" * 70)
+    logger.info("WORKFLOW COMPLETED")
+    logger.info("=" * 70)
+    
+    for label, value in rows:
+        logger.info("%s: %s", label, value)
     
     logger.info("=" * 70)
+    return rows
@@ -3,16 +3,74 @@ AI-Powered Incident Response System - LangGraph Refactored
 Main entry point for the application
 """
 
+from __future__ import annotations
+
 import sys
+import asyncio
 import argparse
 import logging
+from dataclasses import dataclass
 from datetime import datetime
 
 from config import validate_config, get_config_value
-from graph import execute_incident_workflow
+from agents.email_notifier import drain_pending_emails
+from graph import execute_incident_workflow, execute_incident_workflow_batch, display_results
 from utils.logging_utils import setup_logging
 
 
+@dataclass(frozen=True)
+class Scenario:
+    """Demo incident scenario"""
+    
+    __slots__ = ('name', 'alert', 'description')
+    
+    name: str
+    alert: str
+    description: str
+
+
+SCENARIOS = (
+    Scenario(
+        name="Database Timeout",
+        alert="Payment API experiencing database connection timeouts and high error rates",
+        description="High confidence scenario - should auto-resolve"
+    ),
+    Scenario(
+        name="Memory Leak",
+        alert="Auth Service showing memory leak patterns and degraded performance",
+        description="Medium confidence scenario - may require escalation"
+    ),
+    Scenario(
+        name="Network Issues",
+        alert="Load balancer reporting uneven traffic distribution and connection failures",
+        description="Complex scenario - likely escalation"
+    ),
+    Scenario(
+        name="Unknown Service",
+        alert="Critical system failure in unknown microservice with no clear symptoms",
+        description="Low confidence scenario - definite escalation"
+    )
+)
+
+# Menus, rendered once
+_INTERACTIVE_MENU = "\n".join([
+    "\nAI-Powered Incident Response System",
+    "=" * 45,
+    "Options:",
+    "  1. Process Incident Alert",
+    "  2. Interactive Demo",
+    "  0. Exit"
+])
+
+_DEMO_MENU = "\n".join(
+    ["Available Demo Scenarios:"]
+    + [f"  {i}. {scenario.name} - {scenario.description}" for i, scenario in enumerate(SCENARIOS, 1)]
+    + ["  5. Custom Alert - Enter your own incident",
+       "  6. All Scenarios - Run 1-4 concurrently",
+       "  0. Exit"]
+)
+
+
 def main():
     """Main application entry point"""
     # Setup logging
@@ -70,6 +128,11 @@ Examples:
         run_interactive_mode()
 
 
+def drain_emails():
+    """Wait for the emails workflow nodes sent in the background, so none is lost at exit"""
+    asyncio.run(drain_pending_emails())
+
+
 def run_incident_response(alert_text: str):
     """Run the incident response workflow"""
     print("\nTRUE PARALLEL MULTI-AGENT INCIDENT RESPONSE")
@@ -77,12 +140,38 @@ def run_incident_response(alert_text: str):
     start_time = datetime.now()
     
     try:
-        result = execute_incident_workflow(alert_text)
+        result = execute_incident_workflow(alert_text, display=False)
+        drain_emails()
+        # Build the summary once for both the log and the console
+        rows = display_results(result)
         end_time = datetime.now()
         duration = (end_time - start_time).total_seconds()
         
         print(f"\nWorkflow completed in {duration:.2f} seconds")
-        print_workflow_summary(result)
+        print_workflow_summary(rows)
+        
+    except Exception as e:
+        print(f"ERROR: Workflow error: {e}")
+        import traceback
+        traceback.print_exc()
+
+
+def run_incident_batch(alerts: list):
+    """Run the incident response workflow for several alerts concurrently"""
+    print(f"\nCONCURRENT INCIDENT RESPONSE - {len(alerts)} incidents")
+    print("=" * 50)
+    start_time = datetime.now()
+    
+    try:
+        results = asyncio.run(execute_incident_workflow_batch(alerts, display=False))
+        drain_emails()
+        summaries = [display_results(result) for result in results]
+        end_time = datetime.now()
+        duration = (end_time - start_time).total_seconds()
+        
+        print(f"\n{len(results)} workflows completed in {duration:.2f} seconds")
+        for rows in summaries:
+            print_workflow_summary(rows)
         
     except Exception as e:
         print(f"ERROR: Workflow error: {e}")
@@ -95,49 +184,21 @@ def run_demo():
     print("\nINTERACTIVE DEMO - AI-Powered Incident Response")
     print("=" * 55)
     
-    scenarios = [
-        {
-            "name": "Database Timeout",
-            "alert": "Payment API experiencing database connection timeouts and high error rates",
-            "description": "High confidence scenario - should auto-resolve"
-        },
-        {
-            "name": "Memory Leak",
-            "alert": "Auth Service showing memory leak patterns and degraded performance",
-            "description": "Medium confidence scenario - may require escalation"
-        },
-        {
-            "name": "Network Issues",
-            "alert": "Load balancer reporting uneven traffic distribution and connection failures",
-            "description": "Complex scenario - likely escalation"
-        },
-        {
-            "name": "Unknown Service",
-            "alert": "Critical system failure in unknown microservice with no clear symptoms",
-            "description": "Low confidence scenario - definite escalation"
-        }
-    ]
-    
-    print("Available Demo Scenarios:")
-    for i, scenario in enumerate(scenarios, 1):
-        print(f"  {i}. {scenario['name']} - {scenario['description']}")
-    
-    print("  5. Custom Alert - Enter your own incident")
-    print("  0. Exit")
+    print(_DEMO_MENU)
     
     while True:
         try:
-            choice = input("\nSelect scenario (0-5): ").strip()
+            choice = input("\nSelect scenario (0-6): ").strip()
             
             if choice == "0":
                 print("Demo completed!")
                 break
             elif choice in ["1", "2", "3", "4"]:
-                scenario = scenarios[int(choice) - 1]
-                print(f"\nRunning scenario: {scenario['name']}")
-                print(f"Alert: {scenario['alert']}")
+                scenario = SCENARIOS[int(choice) - 1]
+                print(f"\nRunning scenario: {scenario.name}")
+                print(f"Alert: {scenario.alert}")
                 print("-" * 50)
-                run_incident_response(scenario['alert'])
+                run_incident_response(scenario.alert)
                     
             elif choice == "5":
                 custom_alert = input("Enter custom incident alert: ").strip()
@@ -146,8 +207,11 @@ def run_demo():
                 else:
                     print("ERROR: No alert provided")
                     
+            elif choice == "6":
+                run_incident_batch([scenario.alert for scenario in SCENARIOS])
+                    
             else:
-                print("ERROR: Invalid choice. Please select 0-5.")
+                print("ERROR: Invalid choice. Please select 0-6.")
                 
         except KeyboardInterrupt:
             print("\nDemo interrupted!")
@@ -158,12 +222,7 @@ def run_demo():
 
 def run_interactive_mode():
     """Interactive mode for single incident processing"""
-    print("\nAI-Powered Incident Response System")
-    print("=" * 45)
-    print("Options:")
-    print("  1. Process Incident Alert")
-    print("  2. Interactive Demo")
-    print("  0. Exit")
+    print(_INTERACTIVE_MENU)
     
     choice = input("\nSelect option (0-2): ").strip()
     
@@ -182,33 +241,12 @@ def run_interactive_mode():
         print("ERROR: Invalid choice")
 
 
-def print_workflow_summary(result: dict):
-    """Print a summary of workflow results"""
+def print_workflow_summary(rows: list):
+    """Print a summary of workflow results (rows from display_results)"""
     print(f"\nWORKFLOW SUMMARY")
     print("-" * 40)
-    print(f"Incident ID: {result.get('incident_id', 'Unknown')}")
-    print(f"Service: {result.get('service', 'Unknown')}")
-    print(f"Severity: {result.get('severity', 'Unknown')}")
-    
-    # Show decision
-    decision = result.get('decision', 'unknown')
-    print(f"Decision: {decision.upper()}")
-    
-    # Show metrics
-    metrics = result.get("decision_metrics", {})
-    if metrics:
-        print(f"Confidence: {metrics.get('confidence', 0):.2f}")
-        print(f"Anomalies Found: {metrics.get('anomalies_found', False)}")
-        print(f"Similar Incidents: {metrics.get('similar_incidents_count', 0)}")
-        
-        if metrics.get("escalation_reason"):
-            print(f"Escalation Reason: {metrics['escalation_reason']}")
-    
-    # Show final status
-    final_report = result.get("final_report", {})
-    if final_report:
-        print(f"Final Status: {final_report.get('status', 'Unknown')}")
-    
+    for label, value in rows:
+        print(f"{label}: {value}")
     print("-" * 40)
 
 
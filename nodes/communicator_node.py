@@ -3,14 +3,17 @@ Communicator Node - Pure Business Logic
 Generates final status report
 """
 
+from __future__ import annotations
+
 import logging
 from typing import Dict, Any
-from datetime import datetime
+from utils.time_utils import now_str
+from agents.email_notifier import get_email_notifier, dispatch_email, wait_for_emails
 
 logger = logging.getLogger("communicator_node")
 
 
-def communicator_node(state: Dict[str, Any]) -> Dict[str, Any]:
+async def communicator_node(state: Dict[str, Any]) -> Dict[str, Any]:
     """
     Generate final status report
     
@@ -20,39 +23,55 @@ def communicator_node(state: Dict[str, Any]) -> Dict[str, Any]:
     incident_id = state.get("incident_id", "")
     decision = state.get("decision", "unknown")
     
-    logger.info(f"Generating final report for {incident_id}")
+    logger.info("Generating final report for %s", incident_id)
+    
+    timestamp = now_str()
+    
+    # Decision-specific details, resolved before the report is built
+    if decision == "auto_mitigation":
+        mitigation_results = state.get("mitigation_results", {})
+        status = "RESOLVED"
+        resolution = "Automated mitigation executed successfully"
+        details = {"actions_taken": mitigation_results.get("actions_taken", [])}
+    else:
+        escalation_results = state.get("escalation_results", {})
+        status = "ESCALATED"
+        resolution = "Escalated to human operators"
+        details = {
+            "escalation_reason": state.get("escalation_reason", "Unknown"),
+            "assigned_to": escalation_results.get("assigned_to", "Operations Team")
+        }
     
-    # Build final report
+    # Build final report in one literal
     report = {
         "incident_id": incident_id,
         "service": state.get("service", "Unknown"),
         "severity": state.get("severity", "MEDIUM"),
         "decision": decision,
-        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        "timestamp": timestamp,
+        "status": status,
+        "resolution": resolution,
+        **details,
+        "metrics": state.get("decision_metrics", {})
     }
     
-    # Add decision-specific details
-    if decision == "auto_mitigation":
-        mitigation_results = state.get("mitigation_results", {})
-        report["status"] = "RESOLVED"
-        report["resolution"] = "Automated mitigation executed successfully"
-        report["actions_taken"] = mitigation_results.get("actions_taken", [])
-    else:
-        escalation_results = state.get("escalation_results", {})
-        report["status"] = "ESCALATED"
-        report["resolution"] = "Escalated to human operators"
-        report["escalation_reason"] = state.get("escalation_reason", "Unknown")
-        report["assigned_to"] = escalation_results.get("assigned_to", "Operations Team")
-    
-    # Add metrics
-    decision_metrics = state.get("decision_metrics", {})
-    report["metrics"] = decision_metrics
+    logger.info("Final report generated: %s", status)
     
-    logger.info(f"Final report generated: {report['status']}")
+    # Deliver the queued update emails as one digest, and make sure the
+    # alerts sent in the background went out before the workflow ends
+    email_ids = [email["email_id"] for email in state.get("emails_sent", [])]
+    emails_pending = state.get("emails_pending", [])
+    if emails_pending:
+        try:
+            email_notifier = get_email_notifier()
+            email_ids.append(dispatch_email(email_notifier.send_digest, incident_id, status, emails_pending))
+        except Exception as e:
+            logger.warning("Failed to send email digest: %s", e)
+    await wait_for_emails(email_ids)
     
     # Return ONLY report data
     # NO workflow_complete flag - graph handles that
     return {
         "final_report": report,
-        "updated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        "updated_at": timestamp
     }
@@ -3,12 +3,16 @@ Coordinator Node - Pure Business Logic
 Aggregates results from all analysis nodes
 """
 
+from __future__ import annotations
+
 import logging
 from typing import Dict, Any
-from datetime import datetime
+from utils.time_utils import now_str
 
 logger = logging.getLogger("coordinator_node")
 
+_EXPECTED_ANALYSES = frozenset({"log_analysis", "knowledge_lookup", "root_cause"})
+
 
 def coordinator_node(state: Dict[str, Any]) -> Dict[str, Any]:
     """
@@ -24,15 +28,28 @@ def coordinator_node(state: Dict[str, Any]) -> Dict[str, Any]:
     knowledge_results = state.get("knowledge_lookup_results", {})
     root_cause_results = state.get("root_cause_results", {})
     
+    # Nothing to aggregate - decision will escalate on the empty summary
+    if not (log_results or knowledge_results or root_cause_results):
+        logger.warning("No analysis results received - skipping aggregation")
+        return {
+            "coordination_summary": {
+                "total_anomalies": 0,
+                "similar_incidents_count": 0,
+                "ai_confidence": 0.0,
+                "analyses_completed": []
+            },
+            "updated_at": now_str()
+        }
+    
     # Count results
     anomalies_count = len(log_results.get("anomalies", []))
     similar_incidents_count = knowledge_results.get("total_matches", 0)
     confidence = root_cause_results.get("confidence", 0.0)
     
-    logger.info(f"Results collected:")
-    logger.info(f"  Anomalies: {anomalies_count}")
-    logger.info(f"  Similar Incidents: {similar_incidents_count}")
-    logger.info(f"  AI Confidence: {confidence:.2f}")
+    logger.info("Results collected:")
+    logger.info("  Anomalies: %d", anomalies_count)
+    logger.info("  Similar Incidents: %d", similar_incidents_count)
+    logger.info("  AI Confidence: %.2f", confidence)
     
     # Calculate summary
     summary = {
@@ -50,11 +67,18 @@ def coordinator_node(state: Dict[str, Any]) -> Dict[str, Any]:
     if root_cause_results:
         summary["analyses_completed"].append("root_cause")
     
+    completed = summary["analyses_completed"]
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("Analyses completed: %s", ', '.join(completed))
+    if len(completed) < len(_EXPECTED_ANALYSES):
+        missing = sorted(_EXPECTED_ANALYSES.difference(completed))
+        logger.warning("Proceeding without results from: %s", ', '.join(missing))
+    
     logger.info("Coordination complete - ready for decision making")
     
     # Return ONLY business data
     # NO routing decisions, NO completion tracking
     return {
         "coordination_summary": summary,
-        "updated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        "updated_at": now_str()
     }
@@ -3,12 +3,26 @@ Decision Node - Pure Business Logic
 Makes automated decision based on analysis results
 """
 
+from __future__ import annotations
+
 import logging
 from typing import Dict, Any
 from config import get_config_value
 
 logger = logging.getLogger("decision_node")
 
+# Decision thresholds, read from config once at import
+CONFIDENCE_THRESHOLD = get_config_value("CONFIDENCE_THRESHOLD", 0.8)
+MAX_RETRIES = get_config_value("MAX_RETRIES", 3)
+
+# Reason reported for each escalation check, indexed like escalation_checks below
+_ESCALATION_REASONS = (
+    "Max retries ({max_retries}) reached without finding anomalies",
+    "No anomalies detected in log analysis",
+    "Low confidence ({confidence:.2f}) in root cause analysis",
+    "No similar historical incidents found for guidance"
+)
+
 
 def decision_node(state: Dict[str, Any]) -> Dict[str, Any]:
     """
@@ -19,10 +33,6 @@ def decision_node(state: Dict[str, Any]) -> Dict[str, Any]:
     """
     logger.info("Making automated decision")
     
-    # Get configuration
-    CONFIDENCE_THRESHOLD = get_config_value("CONFIDENCE_THRESHOLD", 0.8)
-    MAX_RETRIES = get_config_value("MAX_RETRIES", 3)
-    
     # Extract results
     log_results = state.get("log_analysis_results", {})
     knowledge_results = state.get("knowledge_lookup_results", {})
@@ -32,37 +42,38 @@ def decision_node(state: Dict[str, Any]) -> Dict[str, Any]:
     # Get key metrics
     confidence = root_cause_results.get("confidence", 0.0)
     anomalies_found = log_results.get("anomalies_found", False)
-    similar_incidents = knowledge_results.get("total_matches", 0) > 0
+    total_matches = knowledge_results.get("total_matches", 0)
+    similar_incidents = total_matches > 0
     
-    # Decision logic
-    decision = "auto_mitigation"
-    escalation_reason = ""
+    # Escalation conditions in priority order - the first one that holds sets the reason
+    escalation_checks = (
+        retry_count >= MAX_RETRIES,
+        not anomalies_found,
+        confidence < CONFIDENCE_THRESHOLD,
+        not similar_incidents
+    )
     
-    # Check escalation conditions
-    if retry_count >= MAX_RETRIES:
-        decision = "escalation"
-        escalation_reason = f"Max retries ({MAX_RETRIES}) reached without finding anomalies"
-    elif not anomalies_found:
-        decision = "escalation"
-        escalation_reason = "No anomalies detected in log analysis"
-    elif confidence < CONFIDENCE_THRESHOLD:
-        decision = "escalation"
-        escalation_reason = f"Low confidence ({confidence:.2f}) in root cause analysis"
-    elif not similar_incidents:
+    # Decision logic
+    if True in escalation_checks:
         decision = "escalation"
-        escalation_reason = "No similar historical incidents found for guidance"
+        escalation_reason = _ESCALATION_REASONS[escalation_checks.index(True)].format(
+            max_retries=MAX_RETRIES, confidence=confidence
+        )
+    else:
+        decision = "auto_mitigation"
+        escalation_reason = ""
     
     # Log decision
     if decision == "auto_mitigation":
-        logger.info(f"HIGH CONFIDENCE ({confidence:.2f}) - Auto-mitigation approved")
+        logger.info("HIGH CONFIDENCE (%.2f) - Auto-mitigation approved", confidence)
     else:
-        logger.warning(f"ESCALATING - {escalation_reason}")
+        logger.warning("ESCALATING - %s", escalation_reason)
     
     # Calculate decision metrics
     metrics = {
         "confidence": confidence,
         "anomalies_found": anomalies_found,
-        "similar_incidents_count": knowledge_results.get("total_matches", 0),
+        "similar_incidents_count": total_matches,
         "retry_count": retry_count,
         "escalation_reason": escalation_reason
     }
@@ -3,10 +3,12 @@ Escalation Node - Pure Business Logic
 Escalates incident to human operators
 """
 
+from __future__ import annotations
+
 import logging
 from typing import Dict, Any
-from datetime import datetime
-from agents.email_notifier import EmailNotifier
+from utils.time_utils import now_str
+from agents.email_notifier import EMAIL_ENABLED, get_email_notifier, dispatch_email
 
 logger = logging.getLogger("escalation_node")
 
@@ -23,22 +25,27 @@ def escalation_node(state: Dict[str, Any]) -> Dict[str, Any]:
     severity = state.get("severity", "MEDIUM")
     escalation_reason = state.get("escalation_reason", "Unknown reason")
     
-    logger.info(f"Escalating incident to human operators: {escalation_reason}")
+    logger.info("Escalating incident to human operators: %s", escalation_reason)
     
     # Prepare context for human operators
     context = _prepare_escalation_context(state)
     
+    # Send escalation alert as soon as its context exists; delivery overlaps the rest of the node
+    emails_sent = []
+    if EMAIL_ENABLED:
+        try:
+            email_notifier = get_email_notifier()
+            email_id = dispatch_email(email_notifier.send_escalation_alert, incident_id, escalation_reason, context)
+            emails_sent.append({"email_id": email_id, "type": "escalation_alert"})
+        except Exception as e:
+            logger.warning("Failed to send escalation email: %s", e)
+    
     # Determine priority
     priority = "HIGH" if severity == "HIGH" else "MEDIUM"
     
-    # Send escalation alert
-    try:
-        email_notifier = EmailNotifier()
-        email_notifier.send_escalation_alert(incident_id, escalation_reason, context)
-    except Exception as e:
-        logger.warning(f"Failed to send escalation email: {e}")
+    logger.info("Incident escalated with priority: %s", priority)
     
-    logger.info(f"Incident escalated with priority: {priority}")
+    escalation_time = now_str()
     
     # Return ONLY escalation data
     # NO workflow_complete flag - graph handles that
@@ -48,9 +55,10 @@ def escalation_node(state: Dict[str, Any]) -> Dict[str, Any]:
             "assigned_to": "Senior Operations Team",
             "priority": priority,
             "context_provided": context,
-            "escalation_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            "escalation_time": escalation_time
         },
-        "updated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        "emails_sent": emails_sent,
+        "updated_at": escalation_time
     }
 
 
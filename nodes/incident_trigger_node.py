@@ -3,14 +3,48 @@ Incident Trigger Node - Pure Business Logic
 Parses unstructured alerts into structured data
 """
 
+from __future__ import annotations
+
 import logging
 from typing import Dict, Any
-from datetime import datetime
-from agents.ai_analyzer import AIAnalyzer
-from agents.email_notifier import EmailNotifier
+from utils.cache import LRUCache
+from utils.time_utils import now_str
+from agents.ai_analyzer import get_ai_analyzer
+from agents.text_features import service_fingerprint
+from agents.types import ParsedIncident
+from agents.email_notifier import EMAIL_ENABLED, get_email_notifier, dispatch_email
 
 logger = logging.getLogger("incident_trigger_node")
 
+# Parsed alerts keyed on normalized alert text, so repeated alerts skip the LLM
+_PARSE_CACHE = LRUCache(maxsize=512)
+
+
+def _normalize_alert(raw_alert: str) -> str:
+    """Lowercase and collapse whitespace so trivially different alerts share a key"""
+    return " ".join(raw_alert.lower().split())
+
+
+def _parse_alert(raw_alert: str) -> ParsedIncident:
+    """
+    Parse an alert, reusing the result for alerts seen before
+    
+    Args:
+        raw_alert: Raw alert text
+        
+    Returns:
+        ParsedIncident record
+    """
+    key = _normalize_alert(raw_alert)
+    parsed = _PARSE_CACHE.get(key)
+    if parsed is None:
+        parsed = get_ai_analyzer().parse_incident_alert(raw_alert)
+        # Failed and keyword-fallback parses are not cached, so a retry gets
+        # another chance at the LLM
+        if not parsed.fallback and parsed.service != "Unknown Service":
+            _PARSE_CACHE.set(key, parsed)
+    return parsed
+
 
 def incident_trigger_node(state: Dict[str, Any]) -> Dict[str, Any]:
     """
@@ -22,29 +56,34 @@ def incident_trigger_node(state: Dict[str, Any]) -> Dict[str, Any]:
     raw_alert = state.get("raw_alert", "")
     incident_id = state.get("incident_id", "")
     
-    logger.info(f"Parsing incident alert: {incident_id}")
+    logger.info("Parsing incident alert: %s", incident_id)
     
-    # Use AI analyzer to parse alert
-    ai_analyzer = AIAnalyzer()
-    parsed = ai_analyzer.parse_incident_alert(raw_alert)
+    # Use AI analyzer to parse alert (cached per normalized alert text)
+    parsed = _parse_alert(raw_alert)
     
-    service = parsed.get('service', 'Unknown Service')
-    severity = parsed.get('severity', 'MEDIUM')
-    description = parsed.get('description', raw_alert[:100])
+    service = parsed.service
+    severity = parsed.severity
+    description = parsed.description
     
-    logger.info(f"Parsed - Service: {service}, Severity: {severity}")
+    logger.info("Parsed - Service: %s, Severity: %s", service, severity)
     
-    # Send initial alert email
-    try:
-        email_notifier = EmailNotifier()
-        email_notifier.send_incident_alert(incident_id, service, severity, description)
-    except Exception as e:
-        logger.warning(f"Failed to send email: {e}")
+    # Send initial alert email (in the background)
+    emails_sent = []
+    if EMAIL_ENABLED:
+        try:
+            email_notifier = get_email_notifier()
+            email_id = dispatch_email(email_notifier.send_incident_alert, incident_id, service, severity, description)
+            emails_sent.append({"email_id": email_id, "type": "incident_alert"})
+        except Exception as e:
+            logger.warning("Failed to send email: %s", e)
     
     # Return ONLY business data - no orchestration fields
     return {
         "service": service,
+        # Computed once here so downstream dedup/cache keys (root cause cache) reuse it
+        "service_fingerprint": service_fingerprint(service),
         "severity": severity,
         "description": description,
-        "updated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        "emails_sent": emails_sent,
+        "updated_at": now_str()
     }
@@ -3,14 +3,18 @@ Knowledge Lookup Node - Pure Business Logic
 Searches historical incidents for similar patterns
 """
 
+from __future__ import annotations
+
+import asyncio
 import logging
 from typing import Dict, Any
-from agents.knowledge_searcher import KnowledgeSearcher
+from agents.knowledge_searcher import get_knowledge_searcher
+from agents.text_features import featurize
 
 logger = logging.getLogger("knowledge_lookup_node")
 
 
-def knowledge_lookup_node(state: Dict[str, Any]) -> Dict[str, Any]:
+async def knowledge_lookup_node(state: Dict[str, Any]) -> Dict[str, Any]:
     """
     Search historical incidents for similar patterns
     
@@ -24,17 +28,21 @@ def knowledge_lookup_node(state: Dict[str, Any]) -> Dict[str, Any]:
     log_results = state.get("log_analysis_results", {})
     anomalies = log_results.get("anomalies", [])
     
-    logger.info(f"Searching knowledge base for {service}")
+    logger.info("Searching knowledge base for %s", service)
     
-    # Use knowledge searcher (thin tool)
-    searcher = KnowledgeSearcher()
-    results = searcher.search_similar_incidents(service, description, anomalies)
+    # Use knowledge searcher (thin tool) on a worker thread, like log analysis.
+    # Features are cached per description, so the log analysis scan is reused here
+    searcher = get_knowledge_searcher()
+    loop = asyncio.get_running_loop()
+    results = await loop.run_in_executor(
+        None, searcher.search_similar_incidents, service, featurize(description), anomalies
+    )
     
-    similar_count = results.get('total_matches', 0)
-    logger.info(f"Knowledge lookup complete: {similar_count} similar incidents found")
+    similar_count = results.total_matches
+    logger.info("Knowledge lookup complete: %d similar incidents found", similar_count)
     
     # Return ONLY business data
     # NO agents_completed, NO next, NO stage
     return {
-        "knowledge_lookup_results": results
+        "knowledge_lookup_results": results.to_dict()
     }
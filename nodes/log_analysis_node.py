@@ -3,15 +3,19 @@ Log Analysis Node - Pure Business Logic
 Analyzes system logs for anomalies
 """
 
+from __future__ import annotations
+
+import asyncio
 import logging
 from typing import Dict, Any
-from agents.log_analyzer import LogAnalyzer
-from agents.email_notifier import EmailNotifier
+from agents.log_analyzer import get_log_analyzer
+from agents.text_features import featurize
+from agents.email_notifier import EMAIL_ENABLED
 
 logger = logging.getLogger("log_analysis_node")
 
 
-def log_analysis_node(state: Dict[str, Any]) -> Dict[str, Any]:
+async def log_analysis_node(state: Dict[str, Any]) -> Dict[str, Any]:
     """
     Analyze system logs for anomalies
     
@@ -22,25 +26,28 @@ def log_analysis_node(state: Dict[str, Any]) -> Dict[str, Any]:
     description = state.get("description", "")
     incident_id = state.get("incident_id", "")
     
-    logger.info(f"Analyzing logs for {service}")
+    logger.info("Analyzing logs for %s", service)
     
-    # Use log analyzer (thin tool)
-    analyzer = LogAnalyzer()
-    results = analyzer.analyze_logs(service, description)
+    # Use log analyzer (thin tool) - a sync call, run on a worker thread so the
+    # other analysis nodes keep running while it queries the log back end
+    analyzer = get_log_analyzer()
+    loop = asyncio.get_running_loop()
+    results = await loop.run_in_executor(None, analyzer.analyze_logs, service, featurize(description))
     
-    # Send email if anomalies found
-    if results.get('anomalies_found'):
-        try:
-            email_notifier = EmailNotifier()
-            anomaly_list = [a.get('pattern', '') for a in results.get('anomalies', [])]
-            email_notifier.send_analysis_update(incident_id, anomaly_list)
-        except Exception as e:
-            logger.warning(f"Failed to send email: {e}")
+    # Queue an update email if anomalies found (the communicator sends the batch)
+    emails_pending = []
+    if EMAIL_ENABLED and results.anomalies_found:
+        emails_pending.append({
+            "type": "analysis_update",
+            "incident_id": incident_id,
+            "anomalies": [a.get('pattern', '') for a in results.anomalies]
+        })
     
-    logger.info(f"Log analysis complete: {len(results.get('anomalies', []))} anomalies found")
+    logger.info("Log analysis complete: %d anomalies found", len(results.anomalies))
     
     # Return ONLY business data
     # NO agents_completed, NO next, NO stage
     return {
-        "log_analysis_results": results
+        "log_analysis_results": results.to_dict(),
+        "emails_pending": emails_pending
     }
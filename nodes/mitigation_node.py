@@ -3,13 +3,38 @@ Mitigation Node - Pure Business Logic
 Executes automated mitigation actions
 """
 
+from __future__ import annotations
+
 import logging
-from typing import Dict, Any, List
-from datetime import datetime
-from agents.email_notifier import EmailNotifier
+import re
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, Any, FrozenSet, List, Tuple
+from utils.time_utils import now_str
+from agents.email_notifier import EMAIL_ENABLED
 
 logger = logging.getLogger("mitigation_node")
 
+# Simulated post-mitigation verification results (copied into each result)
+_VERIFICATION_CHECKS = MappingProxyType({
+    "service_health": "HEALTHY",
+    "error_rate": "NORMAL",
+    "response_time": "OPTIMAL"
+})
+
+# Mitigation actions, in the order they are reported: (trigger keywords, action template)
+_ACTIONS: Tuple[Tuple[FrozenSet[str], str], ...] = (
+    (frozenset({'scale', 'pool'}), "Scaled {service} connection pool from 50 to 100 connections"),
+    (frozenset({'restart'}), "Restarted {service} service instances"),
+    (frozenset({'cache'}), "Cleared {service} cache and implemented warming strategy"),
+    (frozenset({'index'}), "Added database index for {service} queries"),
+    (frozenset({'circuit', 'breaker'}), "Implemented circuit breaker pattern for {service}")
+)
+
+# Single pass over the solution for every keyword.
+# The lookahead reports overlapping hits, matching plain substring checks.
+_ACTION_RE = re.compile(r'(?=(scale|pool|restart|cache|index|circuit|breaker))', re.IGNORECASE)
+
 
 def mitigation_node(state: Dict[str, Any]) -> Dict[str, Any]:
     """
@@ -22,7 +47,7 @@ def mitigation_node(state: Dict[str, Any]) -> Dict[str, Any]:
     service = state.get("service", "Unknown Service")
     root_cause_results = state.get("root_cause_results", {})
     
-    logger.info(f"Executing automated mitigation for {service}")
+    logger.info("Executing automated mitigation for %s", service)
     
     # Get recommended solution
     solution = root_cause_results.get("recommended_solution", "Restart service")
@@ -32,20 +57,18 @@ def mitigation_node(state: Dict[str, Any]) -> Dict[str, Any]:
     
     # Verify mitigation success (simulated)
     execution_status = "SUCCESS"
-    verification_checks = {
-        "service_health": "HEALTHY",
-        "error_rate": "NORMAL",
-        "response_time": "OPTIMAL"
-    }
     
-    logger.info(f"Mitigation executed: {execution_status}")
+    logger.info("Mitigation executed: %s", execution_status)
     
-    # Send mitigation report email
-    try:
-        email_notifier = EmailNotifier()
-        email_notifier.send_mitigation_report(incident_id, actions_taken, execution_status)
-    except Exception as e:
-        logger.warning(f"Failed to send email: {e}")
+    # Queue mitigation report email (the communicator sends the batch)
+    emails_pending = []
+    if EMAIL_ENABLED:
+        emails_pending.append({
+            "type": "mitigation_report",
+            "incident_id": incident_id,
+            "actions": actions_taken,
+            "status": execution_status
+        })
     
     # Return ONLY mitigation data
     # NO workflow_complete flag - graph handles that
@@ -54,35 +77,37 @@ def mitigation_node(state: Dict[str, Any]) -> Dict[str, Any]:
             "actions_taken": actions_taken,
             "execution_status": execution_status,
             "resolution_time": "12 minutes",
-            "verification_checks": verification_checks
+            "verification_checks": _VERIFICATION_CHECKS.copy()
         },
-        "updated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        "emails_pending": emails_pending,
+        "updated_at": now_str()
     }
 
 
 def _execute_mitigation_actions(service: str, solution: str) -> List[str]:
     """Execute mitigation actions based on solution"""
-    actions = []
-    
-    # Parse solution and generate actions
-    if 'scale' in solution.lower() or 'pool' in solution.lower():
-        actions.append(f"Scaled {service} connection pool from 50 to 100 connections")
-    
-    if 'restart' in solution.lower():
-        actions.append(f"Restarted {service} service instances")
-    
-    if 'cache' in solution.lower():
-        actions.append(f"Cleared {service} cache and implemented warming strategy")
-    
-    if 'index' in solution.lower():
-        actions.append(f"Added database index for {service} queries")
-    
-    if 'circuit' in solution.lower() or 'breaker' in solution.lower():
-        actions.append(f"Implemented circuit breaker pattern for {service}")
+    action_indices = _solution_actions(solution)
     
     # Default action if no specific actions identified
-    if not actions:
-        actions.append(f"Applied recommended solution: {solution[:100]}")
-        actions.append(f"Restarted {service} service")
+    if not action_indices:
+        return [
+            f"Applied recommended solution: {solution[:100]}",
+            f"Restarted {service} service"
+        ]
     
-    return actions
+    return list(_render_actions(service, action_indices))
+
+
+@lru_cache(maxsize=128)
+def _render_actions(service: str, action_indices: Tuple[int, ...]) -> Tuple[str, ...]:
+    """Action descriptions for a service (cached per service and action set)"""
+    return tuple(_ACTIONS[index][1].format(service=service) for index in action_indices)
+
+
+@lru_cache(maxsize=256)
+def _solution_actions(solution: str) -> Tuple[int, ...]:
+    """Indices of the actions a solution calls for, in table order (cached per solution)"""
+    found = {keyword.lower() for keyword in _ACTION_RE.findall(solution)}
+    if not found:
+        return ()
+    return tuple(index for index, (keywords, _) in enumerate(_ACTIONS) if not keywords.isdisjoint(found))
@@ -3,15 +3,27 @@ Root Cause Node - Pure Business Logic
 Performs AI-powered root cause analysis
 """
 
+from __future__ import annotations
+
+import asyncio
 import logging
 from typing import Dict, Any
-from agents.ai_analyzer import AIAnalyzer
-from agents.email_notifier import EmailNotifier
+from config import get_config_value
+from utils.cache import LRUCache, fingerprint
+from agents.ai_analyzer import AI_UNAVAILABLE, get_ai_analyzer
+from agents.email_notifier import EMAIL_ENABLED
+from agents.text_features import service_fingerprint
 
 logger = logging.getLogger("root_cause_node")
 
+# Recent analyses keyed on their inputs, so retries of the same incident skip the LLM
+_RCA_CACHE = LRUCache(
+    maxsize=int(get_config_value("RCA_CACHE_SIZE", 1024)),
+    ttl=float(get_config_value("RCA_CACHE_TTL", 300))
+)
+
 
-def root_cause_node(state: Dict[str, Any]) -> Dict[str, Any]:
+async def root_cause_node(state: Dict[str, Any]) -> Dict[str, Any]:
     """
     Perform AI-powered root cause analysis
     
@@ -26,31 +38,48 @@ def root_cause_node(state: Dict[str, Any]) -> Dict[str, Any]:
     log_results = state.get("log_analysis_results", {})
     knowledge_results = state.get("knowledge_lookup_results", {})
     
-    logger.info(f"Performing root cause analysis for {service}")
+    logger.info("Performing root cause analysis for %s", service)
     
-    # Use AI analyzer (thin tool)
-    ai_analyzer = AIAnalyzer()
-    results = ai_analyzer.analyze_root_cause(service, description, log_results, knowledge_results)
+    # Use AI analyzer (thin tool), reusing a recent analysis of the same inputs.
+    # The sync call runs on a worker thread: the shared Gemini client's async
+    # transport stays bound to the first event loop, and each workflow run
+    # gets a fresh loop from asyncio.run()
+    key = (
+        state.get("service_fingerprint") or service_fingerprint(service),
+        description,
+        fingerprint(log_results),
+        fingerprint(knowledge_results)
+    )
+    results = _RCA_CACHE.get(key)
+    if results is None:
+        ai_analyzer = get_ai_analyzer()
+        loop = asyncio.get_running_loop()
+        results = await loop.run_in_executor(
+            None, ai_analyzer.analyze_root_cause, service, description, log_results, knowledge_results
+        )
+        # Fallback results are not cached, so a retry gets another chance at the LLM
+        if AI_UNAVAILABLE not in results.contributing_factors:
+            _RCA_CACHE.set(key, results)
     
-    confidence = results.get('confidence', 0.0)
-    root_cause = results.get('root_cause', 'Unknown')
+    confidence = results.confidence
+    root_cause = results.root_cause
     
-    logger.info(f"Root cause analysis complete: Confidence {confidence:.2f}")
+    logger.info("Root cause analysis complete: Confidence %.2f", confidence)
     
-    # Send email notification
-    try:
-        email_notifier = EmailNotifier()
-        email_notifier.send_root_cause_update(
-            incident_id,
-            root_cause,
-            confidence,
-            results.get('recommended_solution', '')
-        )
-    except Exception as e:
-        logger.warning(f"Failed to send email: {e}")
+    # Queue email notification (the communicator sends the batch)
+    emails_pending = []
+    if EMAIL_ENABLED:
+        emails_pending.append({
+            "type": "root_cause_update",
+            "incident_id": incident_id,
+            "root_cause": root_cause,
+            "confidence": confidence,
+            "solution": results.recommended_solution
+        })
     
     # Return ONLY business data
     # NO agents_completed, NO next, NO stage
     return {
-        "root_cause_results": results
+        "root_cause_results": results.to_dict(),
+        "emails_pending": emails_pending
     }
@@ -8,10 +8,12 @@ from typing import TypedDict, List, Dict, Any, Annotated
 
 def merge_lists(existing: List, new: List) -> List:
     """Reducer function for merging lists in parallel updates"""
-    if existing is None:
-        existing = []
-    if new is None:
-        new = []
+    # Most updates leave one side empty - reuse the other list instead of copying.
+    # Never extend in place: earlier states may still reference existing.
+    if not new:
+        return existing if existing is not None else []
+    if not existing:
+        return new
     return existing + new
 
 
@@ -31,6 +33,7 @@ class IncidentState(TypedDict, total=False):
     
     # Parsed incident details
     service: str
+    service_fingerprint: str
     severity: str
     description: str
     
@@ -51,12 +54,16 @@ class IncidentState(TypedDict, total=False):
     decision_metrics: Dict[str, Any]
     escalation_reason: str
     
+    # Final report (populated by communicator node)
+    final_report: Dict[str, Any]
+    
     # Agent completion tracking (managed by graph, not nodes)
     agents_completed: Annotated[List[str], merge_lists]
     agent_errors: Annotated[List[Dict[str, Any]], merge_lists]
     
     # Email tracking
     emails_sent: Annotated[List[Dict[str, Any]], merge_lists]
+    emails_pending: Annotated[List[Dict[str, Any]], merge_lists]
     
     # Workflow control (managed by graph)
     retry_count: int
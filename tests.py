@@ -6,12 +6,14 @@ Tests all major components and services.
 Run with: python tests.py
 """
 
-import os
 import sys
+import json
+import smtplib
+import asyncio
+import importlib
 import unittest
 import logging
-from typing import Dict, Any
-from datetime import datetime
+from unittest import mock
 
 # Configure logging
 logging.basicConfig(
@@ -25,8 +27,6 @@ logger = logging.getLogger("tests")
 # Import the required modules
 try:
     from config import get_config, get_config_value, validate_config
-    from state import IncidentState
-    from graph import create_incident_workflow, create_initial_state
     from nodes.incident_trigger_node import incident_trigger_node
     from nodes.log_analysis_node import log_analysis_node
     from nodes.knowledge_lookup_node import knowledge_lookup_node
@@ -36,16 +36,67 @@ try:
     from nodes.mitigation_node import mitigation_node
     from nodes.escalation_node import escalation_node
     from nodes.communicator_node import communicator_node
-    from agents.log_analyzer import LogAnalyzer
+    from agents.log_analyzer import LogAnalyzer, AnomalyType
     from agents.knowledge_searcher import KnowledgeSearcher
-    from agents.ai_analyzer import AIAnalyzer
-    from agents.email_notifier import EmailNotifier
+    from agents.ai_analyzer import AIAnalyzer, AI_UNAVAILABLE
+    from agents.email_notifier import EmailNotifier, dispatch_email, drain_pending_emails
+    from agents.text_features import featurize
+    from agents.types import ParsedIncident, RootCauseResult
+    from utils.cache import LLMCache, LRUCache
 except ImportError as e:
     logger.error(f"Import error: {e}")
     logger.error("Make sure you're running this test from the project root directory")
     sys.exit(1)
 
 
+def _lazy(module_name: str, attr: str):
+    """Import module_name on first use, so tests that never build the graph skip loading LangGraph"""
+    return getattr(importlib.import_module(module_name), attr)
+
+
+class FakeSMTP:
+    """In-memory stand-in for smtplib.SMTP that records connections and messages"""
+    
+    connections = []
+    
+    def __init__(self, host, port):
+        FakeSMTP.connections.append(self)
+        self.messages = []
+        self.alive = True
+        self.quits = 0
+    
+    def starttls(self):
+        pass
+    
+    def login(self, user, password):
+        pass
+    
+    def noop(self):
+        if not self.alive:
+            raise smtplib.SMTPServerDisconnected("connection dropped")
+        return 250, b"OK"
+    
+    def send_message(self, msg):
+        self.messages.append(msg)
+    
+    def quit(self):
+        self.quits += 1
+    
+    def close(self):
+        pass
+
+
+def _fake_smtp_notifier(max_messages: int = 100) -> EmailNotifier:
+    """Configured EmailNotifier whose sessions connect to FakeSMTP (patch smtplib.SMTP first)"""
+    FakeSMTP.connections = []
+    notifier = EmailNotifier()
+    notifier.email_from = "alerts@example.com"
+    notifier.email_password = "secret"
+    notifier.email_to = "oncall@example.com"
+    notifier.max_messages = max_messages
+    return notifier
+
+
 class TestIncidentResponseSystem(unittest.TestCase):
     """Test suite for AI-Powered Incident Response System"""
     
@@ -74,6 +125,9 @@ class TestIncidentResponseSystem(unittest.TestCase):
         
         max_retries = get_config_value("MAX_RETRIES", 0)
         self.assertGreater(max_retries, 0, "MAX_RETRIES should be > 0")
+        
+        # Test boolean settings are parsed, not kept as strings
+        self.assertIsInstance(get_config_value("EMAIL_ENABLED", True), bool, "EMAIL_ENABLED should be a bool")
 
         logger.info("Configuration tests passed")
     
@@ -82,6 +136,7 @@ class TestIncidentResponseSystem(unittest.TestCase):
         logger.info("Testing state creation...")
         
         # Test creating initial state
+        create_initial_state = _lazy("graph", "create_initial_state")
         state = create_initial_state(self.SAMPLE_ALERT)
         self.assertIsNotNone(state, "State should not be None")
         self.assertEqual(state["raw_alert"], self.SAMPLE_ALERT, "Raw alert should be set correctly")
@@ -104,7 +159,7 @@ class TestIncidentResponseSystem(unittest.TestCase):
         logger.info("Testing log analyzer...")
         
         analyzer = LogAnalyzer()
-        results = analyzer.analyze_logs("Payment API", "database timeout")
+        results = analyzer.analyze_logs("Payment API", "database timeout").to_dict()
         
         self.assertIsNotNone(results, "Log analysis results should not be None")
         self.assertTrue("anomalies" in results, "Results should contain anomalies")
@@ -113,6 +168,8 @@ class TestIncidentResponseSystem(unittest.TestCase):
         
         # Should find anomalies for database timeout
         self.assertTrue(len(results["anomalies"]) > 0, "Should find anomalies for database timeout")
+        self.assertEqual(results["anomalies"][0]["type"], AnomalyType.DB_TIMEOUT.label,
+                         "Anomaly records should carry the type label")
         
         logger.info("Log analyzer tests passed")
     
@@ -126,7 +183,7 @@ class TestIncidentResponseSystem(unittest.TestCase):
             "description": "database timeout"
         }
         
-        result = log_analysis_node(state)
+        result = asyncio.run(log_analysis_node(state))
         
         self.assertIsNotNone(result, "Log analysis node result should not be None")
         self.assertTrue("log_analysis_results" in result, "Result should contain log_analysis_results")
@@ -145,7 +202,7 @@ class TestIncidentResponseSystem(unittest.TestCase):
             "Payment API",
             "database timeout",
             [{"type": "database_timeout"}]
-        )
+        ).to_dict()
         
         self.assertIsNotNone(results, "Knowledge search results should not be None")
         self.assertTrue("similar_incidents" in results, "Results should contain similar_incidents")
@@ -155,6 +212,14 @@ class TestIncidentResponseSystem(unittest.TestCase):
         # Should find similar incidents for Payment API database issues
         self.assertGreater(results["total_matches"], 0, "Should find similar incidents")
         
+        # Precomputed text features give the same result as raw text
+        fused = searcher.search_similar_incidents(
+            "Payment API",
+            featurize("database timeout"),
+            [{"type": "database_timeout"}]
+        )
+        self.assertEqual(fused.total_matches, results["total_matches"], "Features should match raw text search")
+        
         logger.info("Knowledge searcher tests passed")
     
     def test_knowledge_lookup_node(self):
@@ -170,7 +235,7 @@ class TestIncidentResponseSystem(unittest.TestCase):
             }
         }
         
-        result = knowledge_lookup_node(state)
+        result = asyncio.run(knowledge_lookup_node(state))
         
         self.assertIsNotNone(result, "Knowledge lookup node result should not be None")
         self.assertTrue("knowledge_lookup_results" in result, "Result should contain knowledge_lookup_results")
@@ -186,7 +251,7 @@ class TestIncidentResponseSystem(unittest.TestCase):
         analyzer = AIAnalyzer()
         
         # Test alert parsing
-        parsed = analyzer.parse_incident_alert(self.SAMPLE_ALERT)
+        parsed = analyzer.parse_incident_alert(self.SAMPLE_ALERT).to_dict()
         
         self.assertIsNotNone(parsed, "Parsed result should not be None")
         self.assertTrue("service" in parsed, "Parsed should contain service")
@@ -194,7 +259,67 @@ class TestIncidentResponseSystem(unittest.TestCase):
         self.assertTrue("description" in parsed, "Parsed should contain description")
         
         logger.info("AI analyzer tests passed")
-    
+
+    def test_ai_analyzer_batch(self):
+        """Test batched AI parsing keeps one result per alert, in order"""
+        logger.info("Testing AI analyzer batching...")
+
+        analyzer = AIAnalyzer()
+        alerts = [self.SAMPLE_ALERT, "Auth Service memory leak", "Database replication lag"]
+
+        parsed = analyzer.parse_incident_alerts(alerts)
+        self.assertEqual(len(parsed), len(alerts), "Should return one result per alert")
+        for result in parsed:
+            self.assertTrue(result.service, "Parsed should contain service")
+
+        # Batched responses are split on their incident headers
+        blocks = analyzer._split_incident_blocks(
+            "### Incident 1\nService: Payment API\n### Incident 2\nService: Auth Service"
+        )
+        self.assertEqual(sorted(blocks), [1, 2], "Should split one block per incident")
+        self.assertIn("Auth Service", blocks[2], "Blocks should keep their own content")
+
+        logger.info("AI analyzer batching tests passed")
+
+    def test_ai_analyzer_async(self):
+        """Test async AI analysis runs independent calls together"""
+        logger.info("Testing async AI analyzer...")
+
+        analyzer = AIAnalyzer()
+        parsed, root_cause = asyncio.run(analyzer.run_parallel([
+            analyzer.aparse_incident_alert(self.SAMPLE_ALERT),
+            analyzer.aanalyze_root_cause("Payment API", "database timeout", {}, {})
+        ]))
+
+        self.assertTrue(parsed.service, "Parsed should contain service")
+        self.assertGreaterEqual(root_cause.confidence, 0.0, "Root cause should contain confidence")
+
+        logger.info("Async AI analyzer tests passed")
+
+    def test_llm_cache(self):
+        """Test exact and semantic LLM response caching"""
+        logger.info("Testing LLM cache...")
+
+        vectors = {"db timeout": [1.0, 0.0], "database timeout": [0.99, 0.05], "memory leak": [0.0, 1.0]}
+        cache = LLMCache("test-model", maxsize=4, embed_fn=vectors.get, similarity_threshold=0.92)
+
+        self.assertIsNone(cache.get("prompt-1", "db timeout"), "Empty cache should miss")
+        cache.set("prompt-1", "response-1", "db timeout")
+
+        self.assertEqual(cache.get("prompt-1"), "response-1", "Same prompt should hit exactly")
+        self.assertEqual(cache.get("prompt-2", "database timeout"), "response-1",
+                         "Paraphrased text should hit semantically")
+        self.assertIsNone(cache.get("prompt-3", "memory leak"), "Unrelated text should miss")
+        self.assertEqual(cache.get_stats(), {"hits": 1, "semantic_hits": 1, "misses": 2})
+
+        # Expiring entries (root cause analysis cache)
+        ttl_cache = LRUCache(maxsize=4, ttl=0)
+        ttl_cache.set("key", "value")
+        self.assertIsNone(ttl_cache.get("key"), "Expired entry should miss")
+        self.assertEqual(len(ttl_cache), 0, "Expired entry should be dropped")
+
+        logger.info("LLM cache tests passed")
+
     def test_incident_trigger_node(self):
         """Test incident trigger node (pure business logic)"""
         logger.info("Testing incident trigger node...")
@@ -215,6 +340,132 @@ class TestIncidentResponseSystem(unittest.TestCase):
         
         logger.info("Incident trigger node tests passed")
     
+    def test_parse_cache(self):
+        """Test parsed alerts are cached on the normalized alert text, except fallback parses"""
+        logger.info("Testing alert parse cache...")
+        
+        trigger = importlib.import_module("nodes.incident_trigger_node")
+        calls = []
+        
+        class CountingAnalyzer:
+            def parse_incident_alert(self, raw_alert):
+                calls.append(raw_alert)
+                return ParsedIncident(
+                    service=raw_alert.split()[0],
+                    severity="HIGH",
+                    description=raw_alert,
+                    fallback="fallback" in raw_alert
+                )
+        
+        trigger._PARSE_CACHE.clear()
+        with mock.patch.object(trigger, "get_ai_analyzer", CountingAnalyzer):
+            first = trigger._parse_alert("Payment API database timeout")
+            # Whitespace and case variants hit the normalized entry
+            self.assertIs(trigger._parse_alert("  payment   API DATABASE timeout\n"), first)
+            # A different alert gets its own entry
+            other = trigger._parse_alert("Auth Service memory leak")
+            self.assertEqual(len(calls), 2, "Only distinct normalized alerts should reach the analyzer")
+            
+            # Keyword-fallback parses are never cached
+            calls.clear()
+            trigger._parse_alert("Database fallback parse")
+            trigger._parse_alert("Database fallback parse")
+            self.assertEqual(len(calls), 2, "Fallback parses should not be cached")
+        trigger._PARSE_CACHE.clear()
+        
+        self.assertEqual(first.service, "Payment")
+        self.assertEqual(other.service, "Auth")
+        
+        logger.info("Alert parse cache tests passed")
+    
+    def test_root_cause_cache(self):
+        """Test recent root cause analyses are reused, except fallbacks and expired entries"""
+        logger.info("Testing root cause cache...")
+        
+        rca_module = importlib.import_module("nodes.root_cause_node")
+        calls = []
+        factors = ["Connection pool exhausted"]
+        
+        class CountingAnalyzer:
+            def analyze_root_cause(self, service, description, log_results, knowledge_results):
+                calls.append(service)
+                return RootCauseResult(
+                    root_cause="Database connection pool exhausted",
+                    confidence=0.9,
+                    contributing_factors=list(factors),
+                    recommended_solution="Scale database connection pool",
+                    urgency="HIGH",
+                    estimated_resolution_time="15 minutes"
+                )
+        
+        state = {
+            "incident_id": "TEST-INC",
+            "service": "Payment API",
+            "description": "database timeout",
+            "log_analysis_results": {"anomalies": ["timeout"]},
+            "knowledge_lookup_results": {"total_matches": 1}
+        }
+        
+        def analyses(count):
+            calls.clear()
+            for _ in range(count):
+                asyncio.run(root_cause_node(dict(state)))
+            return len(calls)
+        
+        with mock.patch.object(rca_module, "get_ai_analyzer", CountingAnalyzer), \
+                mock.patch.object(rca_module, "_RCA_CACHE", LRUCache(maxsize=8, ttl=300)):
+            self.assertEqual(analyses(2), 1, "Same inputs should reuse the cached analysis")
+            
+            # Different log results are a different key
+            state["log_analysis_results"] = {"anomalies": ["timeout", "errors"]}
+            self.assertEqual(analyses(1), 1)
+            
+            # Fallback results are never cached
+            rca_module._RCA_CACHE.clear()
+            factors[:] = [AI_UNAVAILABLE]
+            self.assertEqual(analyses(2), 2, "AI_UNAVAILABLE fallbacks should not be cached")
+        
+        # Expired entries are analyzed again
+        factors[:] = ["Connection pool exhausted"]
+        with mock.patch.object(rca_module, "get_ai_analyzer", CountingAnalyzer), \
+                mock.patch.object(rca_module, "_RCA_CACHE", LRUCache(maxsize=8, ttl=0)):
+            self.assertEqual(analyses(2), 2, "Expired analyses should not be reused")
+        
+        logger.info("Root cause cache tests passed")
+    
+    def test_root_cause_across_workflows(self):
+        """Test root cause analysis still reaches the model on the second workflow run"""
+        logger.info("Testing root cause analysis across workflow runs...")
+        
+        execute_incident_workflow = _lazy("graph", "execute_incident_workflow")
+        rca_module = importlib.import_module("nodes.root_cause_node")
+        
+        class LoopBoundModel:
+            """Gemini stand-in whose async transport, like grpc.aio, is bound to the first event loop"""
+            loop = None
+            
+            def generate_content(self, prompt, stream=False):
+                return mock.Mock(text="Database connection pool exhausted\nConfidence: 0.9")
+            
+            async def generate_content_async(self, prompt):
+                self.loop = self.loop or asyncio.get_running_loop()
+                if self.loop is not asyncio.get_running_loop():
+                    raise RuntimeError("Event loop is closed")
+                return self.generate_content(prompt)
+        
+        analyzer = AIAnalyzer()
+        analyzer.model = LoopBoundModel()
+        
+        with mock.patch.object(rca_module, "get_ai_analyzer", lambda: analyzer), \
+                mock.patch.object(rca_module, "_RCA_CACHE", LRUCache(maxsize=8, ttl=300)):
+            # Each run gets a fresh event loop from asyncio.run()
+            for alert in ("Payment API database timeout", "Auth Service database timeout"):
+                results = execute_incident_workflow(alert, display=False)["root_cause_results"]
+                self.assertNotIn(AI_UNAVAILABLE, results["contributing_factors"], alert)
+                self.assertEqual(results["confidence"], 0.9)
+        
+        logger.info("Root cause across workflow runs tests passed")
+    
     def test_decision_node(self):
         """Test decision node logic"""
         logger.info("Testing decision node...")
@@ -283,32 +534,67 @@ class TestIncidentResponseSystem(unittest.TestCase):
         """Test workflow structure and graph setup"""
         logger.info("Testing workflow structure...")
         
+        create_incident_workflow = _lazy("graph", "create_incident_workflow")
+        get_workflow = _lazy("graph", "get_workflow")
+        
         workflow = create_incident_workflow()
         
         self.assertIsNotNone(workflow, "Compiled workflow should not be None")
         
+        # Compiled workflow is shared across invocations
+        self.assertIs(get_workflow(), get_workflow(), "Compiled workflow should be cached")
+        
         logger.info("Workflow structure tests passed")
     
+    def test_checkpointed_workflow(self):
+        """Test the workflow runs under a checkpointer and its final state is plain data"""
+        logger.info("Testing checkpointed workflow...")
+        
+        from langgraph.checkpoint.memory import MemorySaver
+        create_incident_workflow = _lazy("graph", "create_incident_workflow")
+        create_initial_state = _lazy("graph", "create_initial_state")
+        
+        workflow = create_incident_workflow(checkpointer=MemorySaver())
+        config = {"configurable": {"thread_id": "test-checkpoint"}}
+        
+        async def run_workflow():
+            final_state = await workflow.ainvoke(create_initial_state(self.SAMPLE_ALERT), config)
+            await drain_pending_emails()
+            return final_state
+        
+        final_state = asyncio.run(run_workflow())
+        
+        # Every step was checkpointed, and the result round-trips through JSON
+        restored = json.loads(json.dumps(final_state))
+        self.assertEqual(restored, final_state, "Final state should round-trip through JSON")
+        self.assertTrue(restored["final_report"], "Final state should contain the final report")
+        self.assertEqual(workflow.get_state(config).values["incident_id"], final_state["incident_id"])
+        
+        logger.info("Checkpointed workflow tests passed")
+    
     def test_full_pipeline(self):
         """Test the full pipeline"""
         logger.info("Testing full pipeline execution...")
         
         # Create initial state
+        create_initial_state = _lazy("graph", "create_initial_state")
         state = create_initial_state(self.SAMPLE_ALERT)
         
         # Execute incident trigger
         trigger_result = incident_trigger_node(state)
         state.update(trigger_result)
         
-        # Execute parallel analyses
-        log_result = log_analysis_node(state)
-        knowledge_result = knowledge_lookup_node(state)
-        root_cause_result = root_cause_node(state)
+        # Execute parallel analyses concurrently, as the graph does
+        async def run_analyses():
+            return await asyncio.gather(
+                log_analysis_node(state),
+                knowledge_lookup_node(state),
+                root_cause_node(state)
+            )
         
-        # Combine results
-        state.update(log_result)
-        state.update(knowledge_result)
-        state.update(root_cause_result)
+        # Combine results (each node writes its own result key)
+        for result in asyncio.run(run_analyses()):
+            state.update(result)
         
         # Execute coordinator
         coord_result = coordinator_node(state)
@@ -348,16 +634,17 @@ class TestIncidentResponseSystem(unittest.TestCase):
             decision_node
         ]
         
+        orchestration_keys = {"agents_completed", "next", "stage"}
+        
         for node in nodes:
-            result = node(state)
-            
-            # Verify nodes return ONLY business data
-            self.assertFalse("agents_completed" in result, 
-                           f"{node.__name__} should NOT return agents_completed")
-            self.assertFalse("next" in result, 
-                           f"{node.__name__} should NOT return next")
-            self.assertFalse("stage" in result, 
-                           f"{node.__name__} should NOT return stage")
+            with self.subTest(node=node.__name__):
+                result = node(state)
+                if asyncio.iscoroutine(result):
+                    result = asyncio.run(result)
+                
+                # Verify nodes return ONLY business data
+                self.assertTrue(orchestration_keys.isdisjoint(result),
+                                f"{node.__name__} should NOT return {orchestration_keys & set(result)}")
         
         logger.info("Node purity tests passed")
     
@@ -399,6 +686,94 @@ class TestIncidentResponseSystem(unittest.TestCase):
         self.assertFalse("workflow_complete" in result, "Node should NOT set workflow_complete")
         
         logger.info("Escalation node tests passed")
+    
+    def test_email_dispatch(self):
+        """Test background email delivery"""
+        logger.info("Testing background email dispatch...")
+        
+        sent = []
+        
+        async def run():
+            dispatch_email(sent.append, "first")
+            dispatch_email(sent.append, "second")
+            await drain_pending_emails()
+        
+        asyncio.run(run())
+        
+        self.assertEqual(sorted(sent), ["first", "second"], "Background emails should be delivered before drain returns")
+        
+        logger.info("Email dispatch tests passed")
+    
+    def test_smtp_session_pool(self):
+        """Test pooled SMTP sessions are reused, recycled at the cap and reconnected when dead"""
+        logger.info("Testing SMTP session pool...")
+        
+        with mock.patch.object(smtplib, "SMTP", FakeSMTP):
+            # Sequential sends reuse one live session
+            notifier = _fake_smtp_notifier()
+            for i in range(6):
+                self.assertTrue(notifier.send_email(f"Update {i}", "body"))
+            self.assertEqual(len(FakeSMTP.connections), 1, "Sequential sends should share one connection")
+            self.assertEqual(len(FakeSMTP.connections[0].messages), 6)
+            
+            # Connections are quit and replaced at the per-connection message cap
+            notifier = _fake_smtp_notifier(max_messages=2)
+            for i in range(5):
+                notifier.send_email(f"Update {i}", "body")
+            self.assertEqual([len(conn.messages) for conn in FakeSMTP.connections], [2, 2, 1])
+            self.assertEqual([conn.quits for conn in FakeSMTP.connections], [1, 1, 0])
+            
+            # A session that fails the NOOP liveness check reconnects before sending
+            notifier = _fake_smtp_notifier()
+            notifier.send_email("First", "body")
+            FakeSMTP.connections[0].alive = False
+            notifier.send_email("Second", "body")
+            self.assertEqual(len(FakeSMTP.connections), 2, "Dead session should be replaced")
+            self.assertEqual(FakeSMTP.connections[0].quits, 1)
+            self.assertEqual(len(FakeSMTP.connections[1].messages), 1)
+            
+            notifier.close_all()
+            self.assertEqual(FakeSMTP.connections[1].quits, 1, "close_all should quit open sessions")
+        
+        logger.info("SMTP session pool tests passed")
+    
+    def test_email_digest(self):
+        """Test queued updates go out as one digest email from the communicator"""
+        logger.info("Testing email digest...")
+        
+        communicator = importlib.import_module("nodes.communicator_node")
+        state = {
+            "incident_id": "TEST-INC",
+            "decision": "auto_mitigation",
+            "emails_pending": [
+                {"type": "analysis_update", "incident_id": "TEST-INC",
+                 "anomalies": ["Connection timeout", "High error rate"]},
+                {"type": "root_cause_update", "incident_id": "TEST-INC",
+                 "root_cause": "Database connection pool exhausted", "confidence": 0.85,
+                 "solution": "Scale database connection pool"},
+                {"type": "mitigation_report", "incident_id": "TEST-INC",
+                 "actions": ["Restarted Payment API", "Scaled connection pool"], "status": "SUCCESS"}
+            ]
+        }
+        
+        with mock.patch.object(smtplib, "SMTP", FakeSMTP):
+            notifier = _fake_smtp_notifier()
+            with mock.patch.object(communicator, "get_email_notifier", lambda: notifier):
+                result = asyncio.run(communicator_node(state))
+        
+        self.assertEqual(result["final_report"]["status"], "RESOLVED")
+        self.assertEqual(len(FakeSMTP.connections), 1)
+        messages = FakeSMTP.connections[0].messages
+        self.assertEqual(len(messages), 1, "Three queued updates should be sent as one email")
+        
+        self.assertEqual(messages[0]["Subject"], "INCIDENT SUMMARY: TEST-INC - RESOLVED")
+        body = messages[0].get_payload()[0].get_payload()
+        for expected in ["LOG ANALYSIS", "ROOT CAUSE ANALYSIS", "AUTOMATED MITIGATION",
+                         "  - Connection timeout", "  - High error rate", "Confidence: 85%",
+                         "  - Restarted Payment API", "  - Scaled connection pool"]:
+            self.assertIn(expected, body)
+        
+        logger.info("Email digest tests passed")
 
 
 def run_tests():
@@ -3,6 +3,10 @@ Utilities Package
 Helper functions and utilities
 """
 
+from __future__ import annotations
+
 from .logging_utils import setup_logging, get_logger
+from .cache import LRUCache, LLMCache, shared_instance, fingerprint
+from .time_utils import now_str
 
-__all__ = ['setup_logging', 'get_logger']
+__all__ = ['setup_logging', 'get_logger', 'LRUCache', 'LLMCache', 'shared_instance', 'fingerprint', 'now_str']
@@ -0,0 +1,218 @@
+"""
+Cache Utilities
+In-process caches for expensive lookups such as LLM calls
+"""
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import json
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple, TypeVar
+
+logger = logging.getLogger("cache")
+
+T = TypeVar("T")
+
+
+class LRUCache:
+    """Thread-safe, size-bounded least-recently-used cache with optional expiry"""
+
+    def __init__(self, maxsize: int = 256, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Any, Any]" = OrderedDict()
+        self._expires: Dict[Any, float] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        """Get a cached value, marking it as recently used"""
+        with self._lock:
+            if key not in self._data:
+                return default
+            if self.ttl is not None and self._expires[key] <= time.monotonic():
+                del self._data[key]
+                del self._expires[key]
+                return default
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def set(self, key: Any, value: Any) -> None:
+        """Cache a value, evicting the least recently used entry when full"""
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if self.ttl is not None:
+                self._expires[key] = time.monotonic() + self.ttl
+            while len(self._data) > self.maxsize:
+                evicted, _ = self._data.popitem(last=False)
+                self._expires.pop(evicted, None)
+
+    def clear(self) -> None:
+        """Remove all cached values"""
+        with self._lock:
+            self._data.clear()
+            self._expires.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class LLMCache:
+    """
+    Two-tier cache for LLM responses
+
+    Exact tier: sha256 of (model, prompt) looked up in an in-process LRU.
+    Semantic tier (optional): cosine similarity between the embedding of a
+    caller-chosen text (e.g. the raw alert) and previously cached ones, so
+    paraphrased inputs can reuse an earlier response.
+    """
+
+    def __init__(self, model_name: str, maxsize: int = 256,
+                 embed_fn: Optional[Callable[[str], Sequence[float]]] = None,
+                 similarity_threshold: float = 0.92):
+        self.model_name = model_name
+        self.similarity_threshold = similarity_threshold
+        self._embed_fn = embed_fn if similarity_threshold > 0 else None
+        self._exact = LRUCache(maxsize)
+        self._embeddings = LRUCache(maxsize)
+        self._semantic: List[Tuple[Sequence[float], float, str]] = []
+        self._semantic_maxsize = maxsize
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "semantic_hits": 0, "misses": 0}
+
+    def get(self, prompt: str, semantic_text: Optional[str] = None) -> Optional[str]:
+        """
+        Look up a cached response
+
+        Args:
+            prompt: Exact prompt sent to the model
+            semantic_text: Optional text to match by embedding similarity
+
+        Returns:
+            Cached response text, or None on a miss
+        """
+        response = self._exact.get(self._key(prompt))
+        if response is not None:
+            self._count("hits")
+            return response
+
+        if semantic_text is not None and self._embed_fn:
+            response = self._nearest(semantic_text)
+            if response is not None:
+                self._count("semantic_hits")
+                return response
+
+        self._count("misses")
+        return None
+
+    def set(self, prompt: str, response: str, semantic_text: Optional[str] = None) -> None:
+        """Cache a response under its prompt (and optionally its semantic text)"""
+        self._exact.set(self._key(prompt), response)
+
+        if semantic_text is not None and self._embed_fn:
+            vector = self._embed(semantic_text)
+            if vector:
+                with self._lock:
+                    self._semantic.append((vector, _norm(vector), response))
+                    if len(self._semantic) > self._semantic_maxsize:
+                        self._semantic.pop(0)
+
+    def _count(self, name: str) -> None:
+        """Bump a stats counter under the lock shared with the semantic tier"""
+        with self._lock:
+            self.stats[name] += 1
+
+    def _key(self, prompt: str) -> str:
+        """Exact-match key for a prompt"""
+        payload = json.dumps({"model": self.model_name, "prompt": prompt}, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _embed(self, text: str) -> Optional[Sequence[float]]:
+        """Embed text, reusing the vector computed for a preceding lookup"""
+        vector = self._embeddings.get(text)
+        if vector is None:
+            try:
+                vector = list(self._embed_fn(text))
+            except Exception as e:
+                logger.warning(f"Embedding failed - skipping semantic cache: {e}")
+                return None
+            self._embeddings.set(text, vector)
+        return vector
+
+    def _nearest(self, text: str) -> Optional[str]:
+        """Return the most similar cached response above the threshold"""
+        query = self._embed(text)
+        if not query:
+            return None
+        query_norm = _norm(query)
+        if not query_norm:
+            return None
+
+        best_score, best_response = self.similarity_threshold, None
+        with self._lock:
+            entries = list(self._semantic)
+        for vector, norm, response in entries:
+            if not norm:
+                continue
+            score = sum(a * b for a, b in zip(query, vector)) / (norm * query_norm)
+            if score >= best_score:
+                best_score, best_response = score, response
+        return best_response
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get hit/miss counters"""
+        with self._lock:
+            return dict(self.stats)
+
+
+def fingerprint(value: Any) -> str:
+    """
+    Stable digest of JSON-like data, for cache keys built from node results
+    
+    Args:
+        value: Dicts, lists and scalars (read-only mappings are accepted too)
+        
+    Returns:
+        32-character hex digest, independent of dict key order
+    """
+    payload = json.dumps(value, sort_keys=True, default=_json_default)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _json_default(value: Any) -> Any:
+    """Serialize values json does not handle natively"""
+    if isinstance(value, Mapping):
+        return dict(value)
+    return str(value)
+
+
+def _norm(vector: Sequence[float]) -> float:
+    """Euclidean norm of a vector"""
+    return math.sqrt(sum(x * x for x in vector))
+
+
+def shared_instance(factory: Callable[[], T]) -> Callable[[], T]:
+    """
+    Decorate a no-argument getter so it builds its instance exactly once
+
+    Unlike lru_cache, concurrent first calls (e.g. nodes running in worker
+    threads) wait for the first construction instead of each building one.
+    """
+    lock = threading.Lock()
+    instance: List[T] = []
+
+    @functools.wraps(factory)
+    def getter() -> T:
+        if not instance:
+            with lock:
+                if not instance:
+                    instance.append(factory())
+        return instance[0]
+
+    return getter
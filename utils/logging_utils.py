@@ -3,6 +3,8 @@ Logging Utilities
 Centralized logging configuration
 """
 
+from __future__ import annotations
+
 import logging
 import os
 from typing import Optional
@@ -0,0 +1,25 @@
+"""
+Time Utilities
+Shared timestamp formatting for workflow state
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Tuple
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# (epoch second, formatted text) of the last call - the format has one-second resolution
+_last: Tuple[int, str] = (-1, "")
+
+
+def now_str() -> str:
+    """Current local time as 'YYYY-MM-DD HH:MM:SS' (formatted at most once per second)"""
+    global _last
+    second = int(time.time())
+    cached_second, text = _last
+    if second != cached_second:
+        text = time.strftime(TIMESTAMP_FORMAT, time.localtime(second))
+        _last = (second, text)
+    return text